@@ -0,0 +1,140 @@
+from math import comb
+import numpy as np
+
+###########################################
+# Closed-form outcomes of a run that ends at max_wins wins or max_losses losses
+# (Arena: 2 losses, Underground: 3 losses; max_wins = len(rewards) - 1)
+#
+# A run ending at (wins, losses) has its last game decided: a win when it ends at max_wins,
+# a loss when it ends at max_losses. The other games can come in any order, so
+#     P(max_wins, l) = C(max_wins - 1 + l, l) * p^max_wins * q^l        for l < max_losses
+#     P(w, max_losses) = C(w + max_losses - 1, w) * p^w * q^max_losses  for w < max_wins
+# The table of (wins, losses, count) depends only on the run limits; every win rate and
+# reward table is then one broadcast product, so a grid of scenarios is a single call.
+#
+#   win_rates = np.linspace(0.3, 0.8, 501)[:, None]      # (501, 1)
+#   tables = np.array([[-38, -40, -15, 0, 50, 200],
+#                      [-38, -40, -15, 0, 60, 250]])     # (2, 6)
+#   ev, var = reward_moments(win_rates, tables, max_losses=2)   # (501, 2) each
+
+def outcome_table(max_wins, max_losses):
+    """
+    Every (wins, losses) a run can end at, in the order arena_outcomes lists them.
+
+    Returns:
+        tuple of np.ndarray: wins, losses, and the number of game orders leading to each.
+    """
+    wins, losses, counts = [], [], []
+    for w in range(max_wins + 1):
+        for l in range(max_losses + 1):
+            if w == max_wins and l < max_losses and w > 0:
+                counts.append(comb(w - 1 + l, l))
+            elif l == max_losses and w < max_wins and l > 0:
+                counts.append(comb(w + l - 1, w))
+            else:
+                continue
+            wins.append(w)
+            losses.append(l)
+    return np.array(wins), np.array(losses), np.array(counts, dtype=float)
+
+def outcome_probabilities(win_rates, max_wins, max_losses):
+    """
+    Args:
+        win_rates (float or array-like): Probability of winning a match, any shape.
+
+    Returns:
+        np.ndarray: Shape win_rates.shape + (outcomes,), the outcomes ordered as in outcome_table.
+    """
+    wins, losses, counts = outcome_table(max_wins, max_losses)
+    p = np.asarray(win_rates, dtype=float)[..., None]
+    return counts * p ** wins * (1 - p) ** losses
+
+def reward_moments(win_rates, rewards, max_losses):
+    """
+    Expected reward and its variance for every combination of win rate and reward table.
+
+    Args:
+        win_rates (float or array-like): Win rates; broadcast against the leading
+            dimensions of rewards.
+        rewards (array-like): Reward for each number of wins along the last axis
+            (index = wins), optionally stacked along leading axes.
+        max_losses (int): Losses that end a run.
+
+    Returns:
+        tuple of np.ndarray: Expected value and variance, of the broadcast shape.
+    """
+    rewards = np.asarray(rewards, dtype=float)
+    max_wins = rewards.shape[-1] - 1
+    wins, _, _ = outcome_table(max_wins, max_losses)
+    probabilities = outcome_probabilities(win_rates, max_wins, max_losses)
+    outcome_rewards = rewards[..., wins]
+    expected = (probabilities * outcome_rewards).sum(axis=-1)
+    second_moment = (probabilities * outcome_rewards ** 2).sum(axis=-1)
+    return expected, np.maximum(second_moment - expected ** 2, 0.0)
+
+def break_even_win_rate(rewards, max_losses, tolerance=1e-9):
+    """
+    Win rate at which the expected reward is zero, for each reward table (bisection on all
+    tables at once). Assumes the expected reward grows with the win rate, which holds
+    when more wins never pay less overall.
+
+    Args:
+        rewards (array-like): Reward tables along the last axis, as in reward_moments.
+
+    Returns:
+        np.ndarray: Break-even win rate per table; 0.0 when even a 0% win rate pays,
+        NaN when even a 100% win rate loses.
+    """
+    rewards = np.asarray(rewards, dtype=float)
+    shape = rewards.shape[:-1]
+    low = np.zeros(shape)
+    high = np.ones(shape)
+    at_low, _ = reward_moments(low, rewards, max_losses)
+    at_high, _ = reward_moments(high, rewards, max_losses)
+    while np.any(high - low > tolerance):
+        middle = (low + high) / 2
+        value, _ = reward_moments(middle, rewards, max_losses)
+        below = value < 0
+        low = np.where(below, middle, low)
+        high = np.where(below, high, middle)
+    result = (low + high) / 2
+    result = np.where(at_low >= 0, 0.0, result)
+    return np.where(at_high < 0, np.nan, result)
+
+def run_outcomes(win_rate, rewards, max_losses):
+    """
+    All possible outcomes of one run, their probabilities, and net rewards.
+
+    Args:
+        win_rate (float): Probability of winning a match (0.0 - 1.0).
+        rewards (list): Reward for each number of wins (index = wins).
+        max_losses (int): Losses that end a run.
+
+    Returns:
+        list of dict: Each dict contains 'wins', 'losses', 'probability', 'reward'.
+    """
+    wins, losses, _ = outcome_table(len(rewards) - 1, max_losses)
+    probabilities = outcome_probabilities(win_rate, len(rewards) - 1, max_losses)
+    return [{
+        'wins': int(w),
+        'losses': int(l),
+        'probability': float(prob),
+        'reward': rewards[w]
+    } for w, l, prob in zip(wins, losses, probabilities)]
+
+# Add a column for Reward * Probability
+def print_outcome_table(win_rate, rewards, max_losses):
+    outcomes = run_outcomes(win_rate, rewards, max_losses)
+    print(f"{'Wins':>4} {'Losses':>6} {'Probability':>12} {'Reward':>8} {'Reward*P':>12}")
+    print("-" * 52)
+    expected = 0
+    for o in outcomes:
+        reward_p = o['probability'] * o['reward']
+        print(f"{o['wins']:>4} {o['losses']:>6} {o['probability']:12.5%} {o['reward']:8} {reward_p:12.2f}")
+        expected += reward_p
+    print("-" * 52)
+    print(f"Expected net value: {expected:.2f}")
+    _, variance = reward_moments(win_rate, rewards, max_losses)
+    print(f"Standard deviation: {np.sqrt(variance):.2f}")
+    break_even = break_even_win_rate(rewards, max_losses)
+    print(f"Break-even win rate: {break_even:.2%}")
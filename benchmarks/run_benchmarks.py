@@ -0,0 +1,318 @@
+import argparse
+import contextlib
+import functools
+import io
+import json
+import os
+import re
+import statistics
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+
+# CPU only, even on machines with a GPU: the numbers must be comparable between hosts
+os.environ.setdefault("CUDA_VISIBLE_DEVICES", "")
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+sys.path.insert(0, os.path.join(os.path.dirname(BENCH_DIR), "ocr_tests"))
+from synthetic_screens import generate_dataset
+from ocr_session import ENGINE_PRESETS, pick_engine
+
+###########################################
+# Offline end-to-end OCR benchmark on synthetic screenshots
+#
+# Runs the doctr (Report/Session), EasyOCR and Tesseract (Community Research) front-ends over
+# screenshots rendered by synthetic_screens.py and reports per-stage latency, throughput,
+# peak RSS and field accuracy. Each engine runs in its own process so peak RSS is its own.
+# Every doctr --engine preset is measured, full frame and through the ROI path; the saved
+# baseline is what --engine auto uses to pick the fastest preset within the accuracy
+# tolerance (full-frame numbers only).
+# Model weights must already be in the local doctr/EasyOCR caches (no downloads are made).
+#
+# Usage:
+#   python benchmarks/run_benchmarks.py                   # compare against baseline.json
+#   python benchmarks/run_benchmarks.py --save-baseline   # record a new baseline
+
+DEFAULT_BASELINE = os.path.join(BENCH_DIR, "baseline.json")
+STAGES = ("decode", "preprocess", "detect", "recognise", "parse", "write")
+# "<preset>-roi" reads Report/Session screens through the ROI path (--roi): field crops go
+# straight to the recogniser, with full-frame OCR only for the screens that fail validation
+ROI_ENGINES = tuple(f"{engine}-roi" for engine in ENGINE_PRESETS)
+ENGINES = (*ENGINE_PRESETS, *ROI_ENGINES, "easyocr", "tesseract")
+
+class StageTimer:
+    def __init__(self):
+        self.durations = {stage: [] for stage in STAGES}
+
+    @contextlib.contextmanager
+    def stage(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.durations[name].append(time.perf_counter() - start)
+
+def peak_rss_mb():
+    try:
+        import resource
+    except ImportError:
+        return None  # Not available on Windows
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS bytes
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+def field_accuracy(expected, parsed, fields):
+    return sum(1 for field in fields if parsed.get(field) == expected[field]) / len(fields)
+
+COMMUNITY_FIELDS = ("username", "pokemon", "style", "reward")
+
+def community_accuracy(expected_rows, parsed_rows):
+    """
+    Share of the expected username / Pokémon / style / reward values that were read
+    correctly. Each expected row is scored against the unused parsed row agreeing with it
+    on the most fields, so a dropped or spurious row only costs its own fields.
+
+    Args:
+        parsed_rows (iterable): (username, pokemon, style, reward) per parsed row.
+    """
+    expected = [tuple(str(row[field]) for field in COMMUNITY_FIELDS) for row in expected_rows]
+    unused = [tuple(str(value).strip() for value in row) for row in parsed_rows]
+    matched = 0
+    for row in expected:
+        if not unused:
+            break
+        scores = [sum(a == b for a, b in zip(row, candidate)) for candidate in unused]
+        best = max(range(len(unused)), key=scores.__getitem__)
+        matched += scores[best]
+        unused.pop(best)
+    return matched / (len(expected) * len(COMMUNITY_FIELDS))
+
+def split_studied(studied):
+    # Tesseract rows keep "Swablu's Roosting Sleep" in one column
+    match = re.match(r"(.*?)['’]s\s+(.*?)(?:\s+Sleep)?$", studied or "")
+    return (match.group(1), match.group(2)) if match else (studied or "", "")
+
+# ---------------------------
+# Engines (each runs inside its own worker process)
+# ---------------------------
+def bench_doctr(dataset, work_dir, engine="doctr"):
+    from image_prefetch import load_rgb
+    from ocr_session import get_session
+    from read_report_session_info import classify_extracted_text
+    from result_journal import ResultJournal
+
+    session = get_session(warm_start=True, engine=engine)  # Model setup is not part of the per-image numbers
+    timer = StageTimer()
+    scores = []
+    with ResultJournal(os.path.join(work_dir, f"{engine}.journal.jsonl")) as journal:
+        for path, kind, expected in dataset:
+            if kind not in ("Report", "Session"):
+                continue
+            with timer.stage("decode"):
+                pages = [load_rgb(path)]
+            # doctr preprocesses inside its predictors, so that time is part of detect.
+            # Detection is timed on its own; recognition is the rest of a full predictor call.
+            with timer.stage("detect"):
+                session.model.det_predictor(pages)
+            start = time.perf_counter()
+            result = session.model(pages)
+            timer.durations["recognise"].append(max(0.0, time.perf_counter() - start - timer.durations["detect"][-1]))
+            with timer.stage("parse"), contextlib.redirect_stdout(io.StringIO()):
+                # With the page export, as the pipeline does, so labels are matched by geometry
+                info = classify_extracted_text(result.render(), path, result.pages[0].export())
+            with timer.stage("write"):
+                journal.append(path, info)
+            scores.append(field_accuracy(expected, info, expected) if info["image_type"] == kind else 0.0)
+    return timer.durations, scores, peak_rss_mb()
+
+def bench_doctr_roi(dataset, work_dir, engine="doctr"):
+    from image_handle import ImageHandle
+    from ocr_session import get_session
+    from read_report_session_info import classify_extracted_text, parse_roi_texts
+    from result_journal import ResultJournal
+    from roi_layouts import text_line
+
+    session = get_session(warm_start=True, engine=engine)
+    timer = StageTimer()
+    scores = []
+    with ResultJournal(os.path.join(work_dir, f"{engine}-roi.journal.jsonl")) as journal:
+        for path, kind, expected in dataset:
+            if kind not in ("Report", "Session"):
+                continue
+            with ImageHandle(path) as image:
+                with timer.stage("decode"):
+                    image.rgb  # Decoded on first access
+                with timer.stage("preprocess"):
+                    lines = {field: text_line(crop) for field, crop in image.crop_rois(kind).items()}
+                # No detect stage: the crops are the text lines
+                with timer.stage("recognise"):
+                    recognised = session.recognise(list(lines.values()))
+                with timer.stage("parse"):
+                    texts = {field: text for field, (text, _) in zip(lines, recognised)}
+                    info = parse_roi_texts(kind, texts, path)
+                if info is None:
+                    # Full-frame fallback, as in the pipeline: its cost belongs to this path
+                    start = time.perf_counter()
+                    result = session.model([image.rgb])
+                    with contextlib.redirect_stdout(io.StringIO()):
+                        info = classify_extracted_text(result.render(), path, result.pages[0].export())
+                    timer.durations["recognise"][-1] += time.perf_counter() - start
+            with timer.stage("write"):
+                journal.append(path, info)
+            scores.append(field_accuracy(expected, info, expected) if info["image_type"] == kind else 0.0)
+    return timer.durations, scores, peak_rss_mb()
+
+def bench_easyocr(dataset, work_dir):
+    import cv2
+    from easy_ocr_test import EasyOcrEngine, parse_ocr_result
+
+    reader = EasyOcrEngine(gpu=False, download_enabled=False).reader
+    timer = StageTimer()
+    scores = []
+    for i, (path, kind, expected) in enumerate(dataset):
+        if kind != "Community Research":
+            continue
+        with timer.stage("decode"):
+            img = cv2.imread(path)
+        with timer.stage("preprocess"):
+            gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+        with timer.stage("detect"):
+            horizontal_list, free_list = reader.detect(img)
+        with timer.stage("recognise"):
+            results = reader.recognize(gray, horizontal_list[0], free_list[0])
+        with timer.stage("parse"), contextlib.redirect_stdout(io.StringIO()):
+            df = parse_ocr_result(results)
+        with timer.stage("write"):
+            df.to_csv(os.path.join(work_dir, f"easyocr_{i}.csv"), index=False)
+        scores.append(community_accuracy(expected, df[["Username", "Pokemon", "Sleep_Style", "Reward"]].itertuples(index=False)))
+    return timer.durations, scores, peak_rss_mb()
+
+def bench_tesseract(dataset, work_dir):
+    import cv2
+    from read_community_research import parse_community_lines, preprocess, tesseract_words, words_to_lines
+
+    timer = StageTimer()
+    scores = []
+    for i, (path, kind, expected) in enumerate(dataset):
+        if kind != "Community Research":
+            continue
+        with timer.stage("decode"):
+            img = cv2.imread(path)
+        with timer.stage("preprocess"):
+            thresh = preprocess(img)
+        # Tesseract detects and recognises in one call
+        with timer.stage("recognise"):
+            words = tesseract_words(thresh)
+        with timer.stage("parse"):
+            df = parse_community_lines([line for line in words_to_lines(words) if line])
+        with timer.stage("write"):
+            df.to_csv(os.path.join(work_dir, f"tesseract_{i}.csv"), index=False)
+        scores.append(community_accuracy(expected, [(row.Username, *split_studied(row.Studied), row.Reward)
+                                                    for row in df.itertuples(index=False)]))
+    return timer.durations, scores, peak_rss_mb()
+
+BENCHMARKS = {
+    **{engine: functools.partial(bench_doctr, engine=engine) for engine in ENGINE_PRESETS},
+    **{f"{engine}-roi": functools.partial(bench_doctr_roi, engine=engine) for engine in ENGINE_PRESETS},
+    "easyocr": bench_easyocr,
+    "tesseract": bench_tesseract,
+}
+
+def run_engine(engine, dataset, work_dir):
+    durations, scores, rss = BENCHMARKS[engine](dataset, work_dir)
+    images = len(scores)
+    stage_means = {stage: statistics.mean(values) for stage, values in durations.items() if values}
+    per_image = sum(stage_means.values())
+    return {
+        "images": images,
+        "stages_s": stage_means,
+        "per_image_s": per_image,
+        "throughput_img_s": 1 / per_image if per_image else None,
+        "peak_rss_mb": rss,
+        "accuracy": statistics.mean(scores) if scores else None,
+    }
+
+# ---------------------------
+# Reporting
+# ---------------------------
+def print_summary(results):
+    header = f"{'Engine':<16} {'Images':>6} " + " ".join(f"{s:>10}" for s in STAGES)
+    header += f" {'Total ms':>9} {'img/s':>7} {'RSS MB':>7} {'Acc':>5}"
+    print(header)
+    print("-" * len(header))
+    for engine, r in results.items():
+        stages = " ".join(f"{r['stages_s'][s] * 1000:10.1f}" if s in r["stages_s"] else f"{'-':>10}" for s in STAGES)
+        rss = f"{r['peak_rss_mb']:7.0f}" if r["peak_rss_mb"] is not None else f"{'-':>7}"
+        acc = f"{r['accuracy']:5.0%}" if r["accuracy"] is not None else f"{'-':>5}"
+        print(f"{engine:<16} {r['images']:>6} {stages} {r['per_image_s'] * 1000:9.1f} "
+              f"{r['throughput_img_s'] or 0:7.2f} {rss} {acc}")
+
+def compare_to_baseline(results, baseline, threshold):
+    """
+    Returns:
+        list of str: One message per engine slower than baseline * (1 + threshold).
+    """
+    regressions = []
+    for engine, r in results.items():
+        base = baseline.get(engine)
+        if not base:
+            continue
+        limit = base["per_image_s"] * (1 + threshold)
+        if r["per_image_s"] > limit:
+            regressions.append(f"{engine}: {r['per_image_s'] * 1000:.1f} ms/image, "
+                               f"baseline {base['per_image_s'] * 1000:.1f} ms (+{threshold:.0%} allowed)")
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline OCR pipeline benchmark on synthetic screenshots.")
+    parser.add_argument("--engines", nargs="+", choices=ENGINES, default=list(ENGINES))
+    parser.add_argument("--count", type=int, default=5, help="Screenshots of each kind to render (default: 5)")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="Baseline JSON file")
+    parser.add_argument("--save-baseline", action="store_true", help="Store this run as the new baseline")
+    parser.add_argument("--threshold", type=float, default=0.25,
+                        help="Allowed slowdown against the baseline before failing (default: 0.25)")
+    parser.add_argument("--accuracy-tolerance", type=float, default=0.02,
+                        help="Accuracy an engine may lose and still be picked for being faster (default: 0.02)")
+    parser.add_argument("--output", help="Also write the results as JSON to this file")
+    args = parser.parse_args()
+
+    results = {}
+    with tempfile.TemporaryDirectory() as work_dir:
+        dataset = generate_dataset(os.path.join(work_dir, "images"), args.count)
+        for engine in args.engines:
+            # Fresh process per engine: isolated peak RSS and no cross-engine warm caches
+            with ProcessPoolExecutor(max_workers=1, mp_context=get_context("spawn")) as executor:
+                try:
+                    results[engine] = executor.submit(run_engine, engine, dataset, work_dir).result()
+                except Exception as e:
+                    print(f"Skipping {engine}: {e}")
+
+    print_summary(results)
+    choice = pick_engine(results, args.accuracy_tolerance)
+    if choice:
+        print(f"Report/Session engine for --engine auto: {choice} "
+              f"(fastest within {args.accuracy_tolerance:.0%} of the best accuracy)")
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+    if args.save_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"Baseline saved to {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print("No baseline yet; run with --save-baseline to record one.")
+        return 0
+    with open(args.baseline, encoding="utf-8") as f:
+        regressions = compare_to_baseline(results, json.load(f), args.threshold)
+    for message in regressions:
+        print(f"REGRESSION {message}")
+    return 1 if regressions else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,182 @@
+import os
+import random
+import sys
+from PIL import Image, ImageDraw, ImageFont
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from roi_layouts import ROI_LAYOUTS, scale_box
+
+###########################################
+# Synthetic Report / Session / Community Research screenshots with known values
+#
+# Every field is drawn, label and value on one row as on the real screens (Report values
+# right-aligned, far from their labels), inside its own ROI box (roi_layouts.py). The
+# boxes are padded and overlap their neighbours, so the text goes in the part of the box
+# no other box covers: each ROI crop then holds exactly one field, and the full frame
+# shows the fields where the app shows them. Everything is rendered locally with Pillow:
+# no screenshots or network access needed.
+
+SCREEN_SIZE = (1080, 2400)
+BACKGROUND = (246, 241, 228)
+TEXT_COLOR = (70, 60, 50)
+# Font sizes in pixels of a 2400 px tall frame
+TEXT_SIZE = 40
+TITLE_SIZE = 60
+
+USERNAMES = ["riddelhx", "Ludy17L", "snorlaxfan", "MiraSleeps", "pikapika22", "nightowl"]
+POKEMON = ["Swablu", "Pikachu", "Eevee", "Jigglypuff", "Bulbasaur", "Snorlax", "Cubone", "Dratini"]
+SLEEP_STYLES = ["Roosting", "Belly", "Atop-Belly", "Back", "Curled-Up", "Sprawled", "Snuggly"]
+WEEKDAYS = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+MONTHS = ["January", "February", "March", "April", "May", "June",
+          "July", "August", "September", "October", "November", "December"]
+
+def load_font(size):
+    for name in ("DejaVuSans.ttf", "arial.ttf"):
+        try:
+            return ImageFont.truetype(name, size)
+        except OSError:
+            continue
+    try:
+        return ImageFont.load_default(size)
+    except TypeError:
+        # Pillow < 10.1 only has the fixed-size bitmap font
+        return ImageFont.load_default()
+
+def text_area(layout, field):
+    """
+    The part of a field's box that no other box of the layout covers: stacked boxes give
+    up the rows they share, side-by-side boxes the columns.
+    """
+    x0, y0, x1, y1 = layout[field]
+    for other, (ox0, oy0, ox1, oy1) in layout.items():
+        if other == field or ox0 >= x1 or ox1 <= x0 or oy0 >= y1 or oy1 <= y0:
+            continue
+        if min(x1, ox1) - max(x0, ox0) > 0.5 * min(x1 - x0, ox1 - ox0):
+            if oy0 > y0:
+                y1 = min(y1, oy0)
+            else:
+                y0 = max(y0, oy1)
+        elif ox0 > x0:
+            x1 = min(x1, ox0)
+        else:
+            x0 = max(x0, ox1)
+    return x0, y0, x1, y1
+
+def draw_in_box(draw, box, text, size=SCREEN_SIZE, align="left", font_size=TEXT_SIZE):
+    x0, y0, x1, y1 = scale_box(box, *size)
+    margin = 20
+    # Scaled with the frame, then shrunk until the line fits the box
+    font_px = min(int(font_size * size[1] / 2400), int((y1 - y0) * 0.8))
+    font = load_font(font_px)
+    while font_px > 8 and draw.textlength(text, font=font) > x1 - x0 - 2 * margin:
+        font_px -= 2
+        font = load_font(font_px)
+    text_width = draw.textlength(text, font=font)
+    x = x0 + margin if align == "left" else x1 - margin - text_width
+    y = (y0 + y1) / 2 - font_px / 2
+    draw.text((x, y), text, fill=TEXT_COLOR, font=font)
+
+def draw_field(draw, layout, field, text, size=SCREEN_SIZE, align="left"):
+    draw_in_box(draw, text_area(layout, field), text, size, align)
+
+def draw_labelled_field(draw, layout, field, label, value, size=SCREEN_SIZE):
+    # Label on the left, value right-aligned on the same row, as the Report screen shows them
+    x0, y0, x1, y1 = text_area(layout, field)
+    middle = (x0 + x1) / 2
+    draw_in_box(draw, (x0, y0, middle, y1), label, size)
+    draw_in_box(draw, (middle, y0, x1, y1), value, size, align="right")
+
+def new_screen(title, size=SCREEN_SIZE):
+    image = Image.new("RGB", size, BACKGROUND)
+    draw = ImageDraw.Draw(image)
+    if title:
+        draw_in_box(draw, (0.04, 0.10, 0.96, 0.16), title, size, font_size=TITLE_SIZE)
+    return image, draw
+
+def render_report(values, size=SCREEN_SIZE):
+    image, draw = new_screen("Sleep Research Result", size)
+    layout = ROI_LAYOUTS["Report"]
+    draw_labelled_field(draw, layout, "pokemon_seen", "Pokémon Seen", str(values["pokemon_seen"]), size)
+    draw_labelled_field(draw, layout, "research_exp", "Research EXP", f"{values['research_exp']:,}", size)
+    draw_labelled_field(draw, layout, "exp_multiplier", "Bonus", f"x{values['exp_multiplier']:.2f}", size)
+    draw_labelled_field(draw, layout, "dream_shards", "Dream Shards", f"{values['dream_shards']:,}", size)
+    return image
+
+def render_session(values, size=SCREEN_SIZE):
+    image, draw = new_screen(None, size)
+    layout = ROI_LAYOUTS["Session"]
+    draw_field(draw, layout, "date", values["date"], size)
+    draw_field(draw, layout, "session_number", f"Session {values['session_number']}", size)
+    draw_field(draw, layout, "snorlax_strength", f"Snorlax Strength {values['snorlax_strength']:,}", size)
+    draw_field(draw, layout, "sleep_score", f"Sleep Score {values['sleep_score']}", size, align="right")
+    draw_field(draw, layout, "drowsy_power", f"Drowsy Power {values['drowsy_power']:,}", size)
+    return image
+
+def render_community(rows, size=SCREEN_SIZE):
+    """
+    One list entry per row: "<user> I studied <Pokémon>'s <Style> Sleep!" over "Reward <n>".
+    """
+    image, draw = new_screen("Community Research", size)
+    row_height = 0.09
+    for i, row in enumerate(rows):
+        top = 0.18 + i * row_height
+        draw_in_box(draw, (0.04, top, 0.96, top + row_height / 2),
+                    f"{row['username']} I studied {row['pokemon']}'s {row['style']} Sleep!", size)
+        draw_in_box(draw, (0.04, top + row_height / 2, 0.96, top + row_height),
+                    f"Reward {row['reward']}", size, align="right")
+    return image
+
+def random_report(rng):
+    return {
+        "pokemon_seen": rng.randint(3, 12),
+        "research_exp": rng.randint(500, 9_000),
+        "exp_multiplier": rng.choice([1.0, 1.09, 1.14, 1.5]),
+        "dream_shards": rng.randint(200, 40_000),
+    }
+
+def random_session(rng):
+    strength = rng.randint(10_000, 900_000)
+    score = rng.randint(50, 100)
+    day = rng.randint(1, 28)
+    month = rng.randint(1, 12)
+    return {
+        "date": f"{rng.choice(WEEKDAYS)}, {MONTHS[month - 1]} {day}, 2025",
+        "session_number": rng.randint(1, 2),
+        "drowsy_power": strength * score,
+        "snorlax_strength": strength,
+        "sleep_score": score,
+    }
+
+def random_community(rng, rows=8):
+    return [{
+        "username": rng.choice(USERNAMES),
+        "pokemon": rng.choice(POKEMON),
+        "style": rng.choice(SLEEP_STYLES),
+        "reward": rng.randint(1, 5),
+    } for _ in range(rows)]
+
+def generate_dataset(out_dir, count=5, seed=0):
+    """
+    Render count screenshots of each kind into out_dir.
+
+    Returns:
+        list of tuple: (image_path, kind, expected values) with kind in
+        "Report", "Session", "Community Research".
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    rng = random.Random(seed)
+    renderers = [
+        ("Report", random_report, render_report),
+        ("Session", random_session, render_session),
+        ("Community Research", random_community, render_community),
+    ]
+    dataset = []
+    for i in range(count):
+        for kind, make_values, render in renderers:
+            values = make_values(rng)
+            # Named like real screenshots so the date-from-filename logic is exercised too
+            name = f"Screenshot_2025-05-{i % 28 + 1:02d}-07-00-{i:02d}_{kind.replace(' ', '_').lower()}.png"
+            path = os.path.join(out_dir, name)
+            render(values).save(path)
+            dataset.append((path, kind, values))
+    return dataset
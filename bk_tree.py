@@ -0,0 +1,66 @@
+###########################################
+# BK-tree: nearest-neighbour lookups under a metric (Hamming distance, edit distance, ...)
+#
+# Every child edge is labelled with its distance to the parent. By the triangle inequality,
+# a search for items within max_distance of a query only has to descend into children whose
+# edge label is within max_distance of the query's distance to the parent, so most of the
+# tree is never visited when max_distance is small.
+
+class BKTree:
+    """
+    Args:
+        distance (callable): Metric taking two keys and returning a non-negative int.
+    """
+
+    def __init__(self, distance):
+        self.distance = distance
+        self._root = None
+        self._size = 0
+
+    def __len__(self):
+        return self._size
+
+    def add(self, key, value=None):
+        # Node: [key, value, {edge distance: child node}]
+        node = [key, value, {}]
+        self._size += 1
+        if self._root is None:
+            self._root = node
+            return
+        current = self._root
+        while True:
+            d = self.distance(key, current[0])
+            child = current[2].get(d)
+            if child is None:
+                current[2][d] = node
+                return
+            current = child
+
+    def search(self, key, max_distance):
+        """
+        Returns:
+            list of tuple: (distance, key, value) of every item within max_distance,
+            closest first.
+        """
+        found = []
+        if self._root is None:
+            return found
+        stack = [self._root]
+        while stack:
+            node_key, value, children = stack.pop()
+            d = self.distance(key, node_key)
+            if d <= max_distance:
+                found.append((d, node_key, value))
+            for edge, child in children.items():
+                if d - max_distance <= edge <= d + max_distance:
+                    stack.append(child)
+        found.sort(key=lambda item: item[0])
+        return found
+
+    def nearest(self, key, max_distance):
+        """
+        Returns:
+            tuple or None: (distance, key, value) of the closest item within max_distance.
+        """
+        found = self.search(key, max_distance)
+        return found[0] if found else None
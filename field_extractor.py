@@ -0,0 +1,129 @@
+import re
+
+###########################################
+# Geometry-aware field extraction from doctr page exports
+#
+# Instead of regex over the rendered text and picking numbers by position, walk the
+# page/block/line/word structure once, find the label anchors ("Drowsy Power", "Research
+# EXP", ...) and give each anchor the closest numeric word to its right or below it.
+# OCR reflow (blocks read in a different order) does not change which number is closest.
+
+# Label anchors per field, as lower-case word sequences
+FIELD_ANCHORS = {
+    "pokemon_seen": [("pokémon", "seen"), ("pokemon", "seen")],
+    "research_exp": [("research", "exp")],
+    "exp_multiplier": [("bonus",)],
+    "dream_shards": [("dream", "shards")],
+    "drowsy_power": [("drowsy", "power")],
+    "snorlax_strength": [("snorlax", "strength"), ("strength",)],
+    "sleep_score": [("sleep", "score")],
+}
+REPORT_FIELDS = ("pokemon_seen", "research_exp", "exp_multiplier", "dream_shards")
+SESSION_FIELDS = ("drowsy_power", "snorlax_strength", "sleep_score")
+FLOAT_FIELDS = {"exp_multiplier"}
+
+NUMBER_PATTERN = re.compile(r'^x?(\d[\d,]*(?:\.\d+)?)$')
+PUNCTUATION = ":!?."
+
+# first anchor word -> [(field, full anchor word tuple)], longest anchors first
+_ANCHOR_INDEX = {}
+for _field, _anchors in FIELD_ANCHORS.items():
+    for _anchor in _anchors:
+        _ANCHOR_INDEX.setdefault(_anchor[0], []).append((_field, _anchor))
+for _candidates in _ANCHOR_INDEX.values():
+    _candidates.sort(key=lambda candidate: -len(candidate[1]))
+
+def _box(geometry):
+    (x0, y0), (x1, y1) = geometry[0], geometry[-1]
+    return x0, y0, x1, y1
+
+def _union(boxes):
+    return (min(b[0] for b in boxes), min(b[1] for b in boxes),
+            max(b[2] for b in boxes), max(b[3] for b in boxes))
+
+def scan_page(page_export):
+    """
+    Single pass over a doctr page export.
+
+    Returns:
+        tuple: (anchors, numbers) where anchors is a list of (field, box, confidence)
+        and numbers a list of (value_text, box, confidence).
+    """
+    anchors = []
+    numbers = []
+    for block in page_export.get("blocks", []):
+        for line in block["lines"]:
+            words = line["words"]
+            tokens = [word["value"].lower().strip(PUNCTUATION) for word in words]
+            i = 0
+            while i < len(words):
+                number = NUMBER_PATTERN.match(words[i]["value"].strip(PUNCTUATION))
+                if number:
+                    numbers.append((number.group(1), _box(words[i]["geometry"]), words[i]["confidence"]))
+                    i += 1
+                    continue
+                matched = 0
+                for field, anchor in _ANCHOR_INDEX.get(tokens[i], ()):
+                    if tuple(tokens[i:i + len(anchor)]) == anchor:
+                        span = words[i:i + len(anchor)]
+                        anchors.append((field, _union([_box(w["geometry"]) for w in span]),
+                                        min(w["confidence"] for w in span)))
+                        matched = len(anchor)
+                        break
+                i += matched or 1
+    return anchors, numbers
+
+def _distance(anchor_box, number_box):
+    """
+    How far a number is from its label: numbers on the same row to the right, or just
+    below, are close; numbers above or to the left of the label are ruled out.
+
+    Returns:
+        tuple or None: (rank, gap), rank 0 for the label's row and 1 for the rows below,
+        so a same-row number always sorts ahead of a lower one, however far right it sits.
+    """
+    ax0, ay0, ax1, ay1 = anchor_box
+    nx0, ny0, nx1, ny1 = number_box
+    anchor_cy = (ay0 + ay1) / 2
+    number_cy = (ny0 + ny1) / 2
+    if number_cy < ay0 or nx1 < ax0:
+        return None
+    if ny0 <= anchor_cy <= ny1:
+        # Same row: horizontal gap (right-aligned values sit far from their label)
+        return 0, max(0.0, nx0 - ax1)
+    # Below: vertical gap, then horizontal offset from the label
+    return 1, 2 * (ny0 - ay1) + 0.5 * abs(nx0 - ax0)
+
+def _parse_value(field, text):
+    text = text.replace(",", "")
+    return float(text) if field in FLOAT_FIELDS else int(float(text))
+
+def extract_fields(page_export, fields):
+    """
+    Match each requested field's label to its nearest numeric word.
+
+    Returns:
+        dict: field -> (value, confidence) for every field that was found.
+    """
+    anchors, numbers = scan_page(page_export)
+    candidates = []
+    for field, anchor_box, anchor_conf in anchors:
+        if field not in fields:
+            continue
+        for index, (text, number_box, number_conf) in enumerate(numbers):
+            distance = _distance(anchor_box, number_box)
+            if distance is not None:
+                candidates.append((distance, field, index, min(anchor_conf, number_conf)))
+
+    # Closest pairs first; each field and each number is used once
+    found = {}
+    used_numbers = set()
+    for distance, field, index, confidence in sorted(candidates, key=lambda c: c[0]):
+        if field in found or index in used_numbers:
+            continue
+        try:
+            found[field] = (_parse_value(field, numbers[index][0]), confidence)
+        except ValueError:
+            continue
+        used_numbers.add(index)
+    return found
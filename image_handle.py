@@ -0,0 +1,123 @@
+import contextlib
+import ocr_profiler
+from roi_layouts import crop_rois, scale_box
+
+###########################################
+# Decode-once image handle
+#
+# One screenshot is decoded a single time into a NumPy buffer; the OCR engine, the overlay
+# renderer, the perceptual hash and the ROI cropper all work on views of that buffer.
+# Derived buffers (RGB, grayscale) are built on first use and kept with the handle.
+# close() (or leaving a with-block) drops every buffer at once. cv2 is imported when the
+# first handle is opened.
+#
+#   with ImageHandle(path) as image:
+#       results = reader.readtext(image.bgr)
+#       overlay = image.copy()
+
+def _cv2():
+    return ocr_profiler.timed_import("cv2")
+
+def path_of(image):
+    # Path of a screenshot given either as a path or as an ImageHandle
+    return image if isinstance(image, str) else image.path
+
+@contextlib.contextmanager
+def open_image(image):
+    """
+    ImageHandle for image: decoded here (and closed on exit) when image is a path, passed
+    through untouched when it already is a handle, whose owner closes it.
+    """
+    if isinstance(image, str):
+        with ImageHandle(image) as handle:
+            yield handle
+    else:
+        yield image
+
+class ImageHandle:
+    def __init__(self, image_path):
+        self.path = image_path
+        bgr = _cv2().imread(image_path)
+        if bgr is None:
+            raise ValueError(f"Could not load image: {image_path}")
+        # Views are handed out to several consumers: none of them may draw on the original
+        bgr.flags.writeable = False
+        self._bgr = bgr
+        self._derived = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+    def close(self):
+        self._bgr = None
+        self._derived.clear()
+
+    @property
+    def closed(self):
+        return self._bgr is None
+
+    @property
+    def bgr(self):
+        """
+        The decoded H x W x 3 BGR buffer (read-only), as cv2 and EasyOCR take it.
+        """
+        if self._bgr is None:
+            raise ValueError(f"Image handle is closed: {self.path}")
+        return self._bgr
+
+    @property
+    def shape(self):
+        return self.bgr.shape
+
+    def _derive(self, name, convert):
+        if name not in self._derived:
+            array = convert(self.bgr)
+            array.flags.writeable = False
+            self._derived[name] = array
+        return self._derived[name]
+
+    @property
+    def rgb(self):
+        """
+        RGB buffer, the page format doctr predictors take (converted once, on first use).
+        """
+        cv2 = _cv2()
+        return self._derive("rgb", lambda bgr: cv2.cvtColor(bgr, cv2.COLOR_BGR2RGB))
+
+    @property
+    def gray(self):
+        cv2 = _cv2()
+        return self._derive("gray", lambda bgr: cv2.cvtColor(bgr, cv2.COLOR_BGR2GRAY))
+
+    def crop(self, box, channels="rgb"):
+        """
+        View of a (x0, y0, x1, y1) box given as fractions of the frame; no pixels are copied.
+        """
+        image = getattr(self, channels)
+        height, width = image.shape[:2]
+        x0, y0, x1, y1 = scale_box(box, width, height)
+        return image[y0:y1, x0:x1]
+
+    def crop_rois(self, layout, channels="rgb"):
+        """
+        Returns:
+            dict: field name -> view of that field's box in ROI_LAYOUTS[layout].
+        """
+        return crop_rois(getattr(self, channels), layout)
+
+    def thumbnail(self, size):
+        """
+        Small grayscale (width, height) thumbnail of the whole frame, for perceptual hashing.
+        """
+        cv2 = _cv2()
+        return cv2.resize(self.gray, size, interpolation=cv2.INTER_AREA)
+
+    def copy(self):
+        """
+        Writable BGR copy, for renderers that draw on the image (e.g. OCR overlays).
+        """
+        return self.bgr.copy()
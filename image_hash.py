@@ -0,0 +1,37 @@
+from image_handle import open_image
+
+###########################################
+# Perceptual hashing of screenshots on a tiny thumbnail (no OCR, no model)
+#
+# Every hash is taken from the same thumbnail (ImageHandle.thumbnail: the full-resolution
+# grayscale buffer reduced with cv2 INTER_AREA), whether the caller passes a path or an
+# already decoded image, so hashes from both are comparable bit for bit.
+
+# Stored with hashes that outlive a run (screen templates): hashes made another way are
+# not comparable and must not be mixed with these
+HASH_METHOD = "dhash/gray/cv2-area"
+
+def dhash(image, hash_size=8):
+    """
+    Difference hash: compares each pixel of a (hash_size+1) x hash_size thumbnail with its
+    right neighbour. Similar layouts give hashes with a small Hamming distance.
+
+    Args:
+        image (str or ImageHandle): A path (decoded just for the hash), or an already
+            decoded image, which is hashed from its buffer without decoding again.
+
+    Returns:
+        int: hash_size * hash_size bit integer.
+    """
+    size = (hash_size + 1, hash_size)
+    with open_image(image) as handle:
+        pixels = handle.thumbnail(size).ravel().tolist()
+    bits = 0
+    for row in range(hash_size):
+        offset = row * (hash_size + 1)
+        for col in range(hash_size):
+            bits = (bits << 1) | (pixels[offset + col] > pixels[offset + col + 1])
+    return bits
+
+def hamming(hash_a, hash_b):
+    return (hash_a ^ hash_b).bit_count()
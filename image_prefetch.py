@@ -0,0 +1,58 @@
+import collections
+from concurrent.futures import ThreadPoolExecutor
+import ocr_profiler
+
+###########################################
+# Bounded prefetch pipeline: decode/preprocess the next images while the model runs
+#
+# File reads, JPEG decoding and cv2 preprocessing release the GIL, so a couple of threads
+# keep the OCR stage supplied with ready arrays instead of leaving it idle on I/O.
+
+def prefetch(items, load, workers=2, depth=4):
+    """
+    Yield (item, load(item)) in input order, with up to depth items loaded ahead of the
+    consumer by a pool of background threads. depth=0 loads inline (no threads).
+    An exception raised by load is re-raised when its item is reached.
+    """
+    if depth <= 0:
+        for item in items:
+            yield item, load(item)
+        return
+
+    items = iter(items)
+    done = object()
+    in_flight = collections.deque()
+    with ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="prefetch") as executor:
+        for item in items:
+            in_flight.append((item, executor.submit(load, item)))
+            if len(in_flight) >= depth:
+                break
+        while in_flight:
+            item, future = in_flight.popleft()
+            # Keep the queue full before handing the ready item to the consumer
+            next_item = next(items, done)
+            if next_item is not done:
+                in_flight.append((next_item, executor.submit(load, next_item)))
+            yield item, future.result()
+
+# ---------------------------
+# Loaders shared by the OCR front-ends
+# ---------------------------
+def load_rgb(image_path):
+    """
+    H x W x 3 uint8 RGB array, the page format doctr predictors take.
+    """
+    cv2 = ocr_profiler.timed_import("cv2")
+    image = cv2.imread(image_path)
+    if image is None:
+        raise ValueError(f"Could not load image: {image_path}")
+    return cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
+
+def load_bgr(image_path):
+    """
+    cv2's native BGR array, as EasyOCR's readtext expects.
+    """
+    image = ocr_profiler.timed_import("cv2").imread(image_path)
+    if image is None:
+        raise ValueError(f"Could not load image: {image_path}")
+    return image
@@ -0,0 +1,104 @@
+import os
+import re
+from datetime import datetime
+from bk_tree import BKTree
+from image_hash import dhash, hamming
+from image_handle import open_image, path_of
+from roi_layouts import ROI_LAYOUTS
+import ocr_profiler
+
+###########################################
+# Near-duplicate screenshots (the same screen captured twice, seconds apart)
+#
+# Each screenshot gets a 16x16 difference hash (256 bits), which is fine enough that two
+# captures of one screen differ by a couple of bits while screens of the same kind with
+# other numbers usually differ by more. That is not guaranteed: two Session or Report
+# screens with different numbers differ only in a few digits, which flip a few bits at
+# most. So a hash match is only a candidate. It must also be taken within max_seconds of
+# the original, and the value regions (every ROI_LAYOUTS box) of both images must be
+# pixel-for-pixel the same up to compression noise. The original is decoded again for
+# that check, which only happens for candidates. Hashes live in a BK-tree, so a lookup
+# only compares against a small part of the images seen so far.
+
+# Union of the field boxes of every known layout: the screen type is not known here
+VALUE_BOXES = [box for layout in ROI_LAYOUTS.values() for box in layout.values()]
+
+TIMESTAMP_PATTERN = re.compile(r"Screenshot_(\d{4}-\d{2}-\d{2}-\d{2}-\d{2}-\d{2})")
+
+def capture_time(image_path):
+    """
+    Seconds since the epoch at which the screenshot was taken: the timestamp in the
+    file name when there is one, otherwise the file's modification time.
+    """
+    match = TIMESTAMP_PATTERN.search(os.path.basename(image_path))
+    if match:
+        try:
+            return datetime.strptime(match.group(1), "%Y-%m-%d-%H-%M-%S").timestamp()
+        except ValueError:
+            pass
+    return os.path.getmtime(image_path)
+
+def value_regions_match(image_a, image_b, scale=0.25, threshold=48, max_changed=8):
+    """
+    Whether two captures show the same values: every VALUE_BOXES crop is compared on a
+    scale-reduced grayscale copy (which averages compression noise away), and at most
+    max_changed pixels per box may differ by more than threshold grey levels. A changed
+    digit alters far more pixels than that.
+
+    Args:
+        image_a, image_b (str or ImageHandle): The two screenshots.
+    """
+    cv2 = ocr_profiler.timed_import("cv2")
+    np = ocr_profiler.timed_import("numpy")
+    with open_image(image_a) as a, open_image(image_b) as b:
+        if a.shape != b.shape:
+            return False
+        for box in VALUE_BOXES:
+            crop_a, crop_b = a.crop(box, "gray"), b.crop(box, "gray")
+            small_a = cv2.resize(crop_a, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+            small_b = cv2.resize(crop_b, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+            if np.count_nonzero(cv2.absdiff(small_a, small_b) > threshold) > max_changed:
+                return False
+    return True
+
+class NearDuplicateIndex:
+    """
+    Args:
+        max_distance (int): Largest Hamming distance between two hashes of the same screen.
+        max_seconds (float): Largest time between the original and its duplicate.
+        hash_size (int): dhash grid size (hash_size * hash_size bits).
+    """
+
+    def __init__(self, max_distance=6, max_seconds=300, hash_size=16):
+        self.max_distance = max_distance
+        self.max_seconds = max_seconds
+        self.hash_size = hash_size
+        self._tree = BKTree(hamming)
+
+    def __len__(self):
+        return len(self._tree)
+
+    def match_or_add(self, image):
+        """
+        Look image up among the screenshots added so far.
+
+        Args:
+            image (str or ImageHandle): Screenshot path or already decoded image.
+
+        Returns:
+            str or None: Path of the screenshot image duplicates, or None if it has no
+            near duplicate (it is then added as a possible original for later images).
+        """
+        image_path = path_of(image)
+        image_hash = dhash(image, self.hash_size)
+        taken = capture_time(image_path)
+        for _, _, (original, original_taken) in self._tree.search(image_hash, self.max_distance):
+            if abs(taken - original_taken) > self.max_seconds:
+                continue
+            try:
+                if value_regions_match(image, original):
+                    return original
+            except ValueError:
+                continue  # Original moved or deleted since it was indexed
+        self._tree.add(image_hash, (image_path, taken))
+        return None
@@ -0,0 +1,215 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+###########################################
+# Content-addressed OCR result cache shared by the doctr, EasyOCR and Tesseract paths
+#
+# Results are keyed by (sha256 of the image bytes, engine, model version), so renamed or
+# re-exported screenshots hit the cache and a model upgrade never serves stale results.
+# Everything lives in a single SQLite file instead of one pickle per image.
+
+DEFAULT_CACHE_NAME = "ocr_cache.sqlite"
+
+def file_sha256(path, chunk_size=1 << 20):
+    """
+    Hash the raw bytes of a file (streamed, so large images are not loaded at once).
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def _to_builtin(value):
+    # numpy scalars/arrays (boxes, confidences) are not JSON serialisable as-is
+    if hasattr(value, "tolist"):
+        return value.tolist()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+class OcrCache:
+    """
+    SQLite-backed store of raw OCR output (words, boxes, confidences) as JSON.
+
+    Args:
+        path (str): SQLite file to open or create.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        parent = os.path.dirname(os.path.abspath(path))
+        os.makedirs(parent, exist_ok=True)
+        # Generous timeout: several worker processes may write to the same file.
+        # The connection may be handed to one background thread (--watch mode).
+        self.conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        # Prefetch threads look results up while the main thread stores new ones
+        self._lock = threading.Lock()
+        self.conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS ocr_results (
+                image_hash TEXT NOT NULL,
+                engine TEXT NOT NULL,
+                model_version TEXT NOT NULL,
+                payload TEXT NOT NULL,
+                created REAL NOT NULL,
+                PRIMARY KEY (image_hash, engine, model_version)
+            )
+            """
+        )
+        self.conn.commit()
+
+    def get(self, image_hash, engine, model_version):
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT payload FROM ocr_results WHERE image_hash = ? AND engine = ? AND model_version = ?",
+                (image_hash, engine, model_version),
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def put(self, image_hash, engine, model_version, payload):
+        payload = json.dumps(payload, default=_to_builtin)
+        with self._lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO ocr_results VALUES (?, ?, ?, ?, ?)",
+                (image_hash, engine, model_version, payload, time.time()),
+            )
+            self.conn.commit()
+
+    def iter_latest(self, engines):
+        """
+        The most recently stored result of every image from any of engines, whatever the
+        model version.
+
+        Returns:
+            list of tuple: (image_hash, engine, model_version, payload).
+        """
+        placeholders = ", ".join("?" * len(engines))
+        with self._lock:
+            rows = self.conn.execute(
+                f"SELECT image_hash, engine, model_version, payload FROM ocr_results "
+                f"WHERE engine IN ({placeholders}) ORDER BY image_hash, created DESC",
+                tuple(engines),
+            ).fetchall()
+        latest = []
+        for image_hash, engine, model_version, payload in rows:
+            if not latest or latest[-1][0] != image_hash:
+                latest.append((image_hash, engine, model_version, json.loads(payload)))
+        return latest
+
+    # doctr pages are stored as columns (see compact_page_export) and handed out as exports
+    def get_page(self, image_hash, engine, model_version):
+        payload = self.get(image_hash, engine, model_version)
+        return expand_page_export(payload) if payload is not None else None
+
+    def put_page(self, image_hash, engine, model_version, page_export):
+        self.put(image_hash, engine, model_version, compact_page_export(page_export))
+
+    # EasyOCR boxes likewise (see compact_text_boxes), handed out as [bbox, text, conf] lists
+    def get_text_boxes(self, image_hash, engine, model_version):
+        payload = self.get(image_hash, engine, model_version)
+        return expand_text_boxes(payload) if payload is not None else None
+
+    def put_text_boxes(self, image_hash, engine, model_version, results, image_name=None):
+        self.put(image_hash, engine, model_version, compact_text_boxes(results, image_name))
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+# ---------------------------
+# doctr helpers
+# ---------------------------
+def render_page_export(page_export):
+    """
+    Rebuild the text that doctr's Page.render() produces from a cached page export:
+    words joined by spaces, lines by newlines, blocks by blank lines.
+    """
+    blocks = []
+    for block in page_export.get("blocks", []):
+        lines = [" ".join(word["value"] for word in line["words"]) for line in block["lines"]]
+        blocks.append("\n".join(lines))
+    return "\n\n".join(blocks)
+
+PAGE_COLUMNS_FORMAT = "words-v1"
+
+def compact_page_export(page_export):
+    """
+    Columnar form of a doctr page export: one list per word attribute (text, confidence,
+    box corners, block and line number) instead of a tree of dicts repeating every key.
+    Keeps everything the parsers use, at a fraction of the size.
+    """
+    columns = {"format": PAGE_COLUMNS_FORMAT, "dimensions": page_export.get("dimensions"),
+               "value": [], "confidence": [], "x0": [], "y0": [], "x1": [], "y1": [], "block": [], "line": []}
+    line_number = 0
+    for block_number, block in enumerate(page_export.get("blocks", [])):
+        for line in block["lines"]:
+            for word in line["words"]:
+                (x0, y0), (x1, y1) = word["geometry"][0], word["geometry"][-1]
+                columns["value"].append(word["value"])
+                columns["confidence"].append(round(float(word["confidence"]), 4))
+                for key, coordinate in (("x0", x0), ("y0", y0), ("x1", x1), ("y1", y1)):
+                    columns[key].append(round(float(coordinate), 4))
+                columns["block"].append(block_number)
+                columns["line"].append(line_number)
+            line_number += 1
+    return columns
+
+def expand_page_export(payload):
+    """
+    Rebuild the blocks/lines/words tree of a page export from compact_page_export columns.
+    Exports cached before the columnar format are returned unchanged.
+    """
+    if payload.get("format") != PAGE_COLUMNS_FORMAT:
+        return payload
+    blocks = []
+    last_block = last_line = None
+    for i, value in enumerate(payload["value"]):
+        if payload["block"][i] != last_block:
+            blocks.append({"lines": []})
+            last_block = payload["block"][i]
+            last_line = None
+        if payload["line"][i] != last_line:
+            blocks[-1]["lines"].append({"words": []})
+            last_line = payload["line"][i]
+        blocks[-1]["lines"][-1]["words"].append({
+            "value": value,
+            "confidence": payload["confidence"][i],
+            "geometry": [[payload["x0"][i], payload["y0"][i]], [payload["x1"][i], payload["y1"][i]]],
+        })
+    return {"dimensions": payload.get("dimensions"), "blocks": blocks}
+
+# ---------------------------
+# EasyOCR helpers
+# ---------------------------
+TEXT_BOXES_FORMAT = "boxes-v1"
+
+def compact_text_boxes(results, image_name=None):
+    """
+    Columnar form of EasyOCR (bbox, text, confidence) results: one list per attribute,
+    each bbox flattened to its four corners' eight pixel coordinates. image_name records
+    the file the image was read from, for re-parsing the cache on its own.
+    """
+    columns = {"format": TEXT_BOXES_FORMAT, "image": image_name, "text": [], "confidence": [], "box": []}
+    for bbox, text, conf in results:
+        columns["text"].append(text)
+        columns["confidence"].append(round(float(conf), 4))
+        columns["box"].append([round(float(coordinate), 1) for point in bbox for coordinate in point])
+    return columns
+
+def expand_text_boxes(payload):
+    """
+    [bbox, text, confidence] lists from compact_text_boxes columns. Results cached as
+    such lists before the columnar format are returned unchanged.
+    """
+    if not isinstance(payload, dict) or payload.get("format") != TEXT_BOXES_FORMAT:
+        return payload
+    return [[[box[i:i + 2] for i in range(0, len(box), 2)], text, conf]
+            for box, text, conf in zip(payload["box"], payload["text"], payload["confidence"])]
@@ -0,0 +1,160 @@
+import os
+import re
+from functools import lru_cache
+
+###########################################
+# OCR text correction: literal fixes and dictionary lookups for names and sleep styles
+#
+# Every literal fix (known misreads such as "Sieep" -> "Sleep") is compiled into one
+# alternation regex, so a token is scanned once whatever the size of the map. Pokémon
+# names and sleep styles are then snapped to the closest entry of a bundled word list
+# (dictionaries/*.txt) within a small edit distance. Lookups use a SymSpell-style deletes
+# table: every string reachable from a dictionary word by deleting up to MAX_EDITS letters
+# points back to that word, so a misread only has to generate its own deletes and measure
+# the few words they hit, instead of comparing against the whole list (a BK-tree still
+# visits most of a 150-name list at distance 2, which costs milliseconds in Python).
+# Exact hits skip the table and repeated tokens are memoised.
+
+DICTIONARY_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "dictionaries")
+DICTIONARIES = {
+    "pokemon": "pokemon.txt",
+    "sleep_style": "sleep_styles.txt",
+}
+
+LITERAL_FIXES = {
+    "Sleepl": "Sleep",
+    "Sieep": "Sleep",
+    "Sllep": "Sleep",
+    "Emper": "Ember",
+}
+
+def edit_distance(a, b):
+    # Levenshtein distance, one DP row at a time
+    if len(a) < len(b):
+        a, b = b, a
+    previous = list(range(len(b) + 1))
+    for i, char_a in enumerate(a, 1):
+        current = [i]
+        for j, char_b in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (char_a != char_b)))
+        previous = current
+    return previous[-1]
+
+def compile_fixes(fixes):
+    """
+    One regex matching any key of fixes. Longer keys come first, so when one misread
+    contains another the longer one wins, as it would have with ordered replaces.
+    """
+    if not fixes:
+        return None
+    keys = sorted(fixes, key=len, reverse=True)
+    return re.compile("|".join(re.escape(key) for key in keys))
+
+def load_word_list(path):
+    with open(path, encoding="utf-8") as f:
+        return [line.strip() for line in f if line.strip() and not line.startswith("#")]
+
+MAX_EDITS = 2
+
+def max_edits(word):
+    # Short words allow fewer edits, or every 5-letter token would snap to some name
+    if len(word) <= 2:
+        return 0
+    return 1 if len(word) <= 5 else MAX_EDITS
+
+def deletes(word, distance):
+    # word and every string obtained from it by deleting up to distance letters
+    found = {word}
+    frontier = {word}
+    for _ in range(distance):
+        frontier = {w[:i] + w[i + 1:] for w in frontier for i in range(len(w))}
+        found |= frontier
+    return found
+
+class WordIndex:
+    """
+    Args:
+        words (iterable of str): Canonical spellings.
+    """
+
+    def __init__(self, words):
+        self._exact = {}
+        # Delete variant -> lower-cased dictionary words it comes from
+        self._deletes = {}
+        for word in words:
+            key = word.lower()
+            if key not in self._exact:
+                self._exact[key] = word
+                for variant in deletes(key, MAX_EDITS):
+                    self._deletes.setdefault(variant, []).append(key)
+        self.lookup = lru_cache(maxsize=4096)(self._lookup)
+
+    def __len__(self):
+        return len(self._exact)
+
+    def _lookup(self, token):
+        key = token.lower()
+        if key in self._exact:
+            return self._exact[key]
+        limit = max_edits(key)
+        if limit == 0:
+            return None
+        candidates = set()
+        for variant in deletes(key, limit):
+            candidates.update(self._deletes.get(variant, ()))
+        best, best_distance = None, limit + 1
+        # Sorted, so a tie always resolves to the same word
+        for candidate in sorted(candidates):
+            if abs(len(candidate) - len(key)) >= best_distance:
+                continue
+            d = edit_distance(key, candidate)
+            if d < best_distance:
+                best, best_distance = candidate, d
+        return self._exact[best] if best is not None else None
+
+    def correct(self, token):
+        """
+        Returns:
+            str: The dictionary spelling of token, or token itself when nothing is close enough.
+        """
+        return self.lookup(token) or token
+
+class TextCorrector:
+    """
+    Args:
+        fixes (dict): Literal misread -> replacement, applied to every token.
+        dictionaries (dict): Kind -> word list file (relative to DICTIONARY_DIR) or list of words.
+    """
+
+    def __init__(self, fixes=LITERAL_FIXES, dictionaries=DICTIONARIES):
+        self.fixes = dict(fixes)
+        self._pattern = compile_fixes(self.fixes)
+        self.indexes = {}
+        for kind, words in dictionaries.items():
+            if isinstance(words, str):
+                words = load_word_list(os.path.join(DICTIONARY_DIR, words))
+            self.indexes[kind] = WordIndex(words)
+
+    def fix(self, text):
+        if self._pattern is None:
+            return text
+        return self._pattern.sub(lambda match: self.fixes[match.group(0)], text)
+
+    def correct(self, token, kind):
+        """
+        Snap token to the closest word of the kind dictionary ("pokemon", "sleep_style").
+        """
+        if not token:
+            return token
+        return self.indexes[kind].correct(token)
+
+_corrector = None
+
+def get_corrector():
+    """
+    Shared TextCorrector with the default fixes and bundled dictionaries (loaded on first use).
+    """
+    global _corrector
+    if _corrector is None:
+        _corrector = TextCorrector()
+    return _corrector
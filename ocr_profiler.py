@@ -0,0 +1,200 @@
+import importlib
+import json
+import os
+import statistics
+import sys
+import threading
+import time
+
+###########################################
+# Lightweight span/timer instrumentation for the OCR entry points
+#
+#   with span("detect"):
+#       ...
+#
+# Disabled (the default), span() returns one shared no-op object, so instrumented code pays
+# a function call and a flag check. Enabled, every span is recorded with the image being
+# processed; the run can then be written as a Chrome trace (chrome://tracing, Perfetto)
+# and summarised as p50/p95 per span name.
+
+_enabled = False
+_events = []
+_events_lock = threading.Lock()
+_local = threading.local()
+# Coarse run timings (framework imports, model setup) for --timings; always collected,
+# as there are only a handful per run
+_timings = {}
+
+class _NullSpan:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+_NULL_SPAN = _NullSpan()
+
+class _Span:
+    __slots__ = ("name", "args", "start")
+
+    def __init__(self, name, args):
+        self.name = name
+        self.args = args
+
+    def __enter__(self):
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc):
+        record(self.name, self.start, time.perf_counter_ns() - self.start, **self.args)
+        return False
+
+def enable():
+    global _enabled
+    _enabled = True
+
+def disable():
+    global _enabled
+    _enabled = False
+
+def is_enabled():
+    return _enabled
+
+def span(name, **args):
+    if not _enabled:
+        return _NULL_SPAN
+    return _Span(name, args)
+
+def record(name, start_ns, duration_ns, **args):
+    """
+    Add a finished span (for timings that can't use a with-block, e.g. torch hooks).
+    """
+    if not _enabled:
+        return
+    image = getattr(_local, "image", None)
+    if image is not None:
+        args.setdefault("image", image)
+    event = {"name": name, "start_ns": start_ns, "dur_ns": duration_ns,
+             "pid": os.getpid(), "tid": threading.get_ident(), "args": args}
+    with _events_lock:
+        _events.append(event)
+
+class image_scope:
+    """
+    Attribute every span recorded inside the block to image_path (or to a batch of paths).
+    """
+
+    def __init__(self, image_path):
+        paths = [image_path] if isinstance(image_path, str) else list(image_path)
+        self.image = ",".join(os.path.basename(p) for p in paths)
+
+    def __enter__(self):
+        if _enabled:
+            self.previous = getattr(_local, "image", None)
+            _local.image = self.image
+        return self
+
+    def __exit__(self, *exc):
+        if _enabled:
+            _local.image = self.previous
+        return False
+
+def add_timing(name, seconds):
+    _timings[name] = _timings.get(name, 0.0) + seconds
+
+def timed_import(module_name):
+    """
+    Import a heavy module (doctr, torch, easyocr, cv2, ...) at the point it is first
+    needed, and record how long the first import took.
+    """
+    start = time.perf_counter()
+    already_loaded = module_name in sys.modules
+    module = importlib.import_module(module_name)
+    if not already_loaded:
+        add_timing(f"import {module_name}", time.perf_counter() - start)
+    return module
+
+def print_timings(start, startup_seconds=None):
+    """
+    Print the run's wall time since start (a perf_counter value), split into start-up,
+    heavy imports and model setup.
+    """
+    print("Timings:")
+    if startup_seconds is not None:
+        print(f"  {'startup':<28} {startup_seconds * 1000:9.1f} ms")
+    for name, seconds in _timings.items():
+        print(f"  {name:<28} {seconds * 1000:9.1f} ms")
+    print(f"  {'total':<28} {(time.perf_counter() - start) * 1000:9.1f} ms")
+
+def drain_events():
+    """
+    Remove and return the recorded events (worker processes send them back to the parent).
+    """
+    with _events_lock:
+        events = list(_events)
+        _events.clear()
+    return events
+
+def add_events(events):
+    with _events_lock:
+        _events.extend(events)
+
+def write_chrome_trace(path):
+    """
+    Write the recorded spans in Chrome trace-event format, one row per process/thread.
+    """
+    with _events_lock:
+        events = list(_events)
+    trace = [{
+        "name": e["name"], "ph": "X", "ts": e["start_ns"] / 1000, "dur": e["dur_ns"] / 1000,
+        "pid": e["pid"], "tid": e["tid"], "args": e["args"],
+    } for e in events]
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"traceEvents": trace, "displayTimeUnit": "ms"}, f)
+
+def write_image_report(path):
+    """
+    Write a JSON file with, for every image (or batch), the total milliseconds per span name.
+    """
+    per_image = {}
+    with _events_lock:
+        for e in _events:
+            image = e["args"].get("image")
+            if image is not None:
+                spans = per_image.setdefault(image, {})
+                spans[e["name"]] = spans.get(e["name"], 0.0) + e["dur_ns"] / 1e6
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(per_image, f, indent=1)
+
+def percentile(values, q):
+    if len(values) == 1:
+        return values[0]
+    return statistics.quantiles(values, n=100, method="inclusive")[q - 1]
+
+def summary():
+    """
+    Returns:
+        dict: span name -> {"count", "total_ms", "p50_ms", "p95_ms"}.
+    """
+    by_name = {}
+    with _events_lock:
+        for e in _events:
+            by_name.setdefault(e["name"], []).append(e["dur_ns"] / 1e6)
+    return {
+        name: {
+            "count": len(values),
+            "total_ms": sum(values),
+            "p50_ms": percentile(values, 50),
+            "p95_ms": percentile(values, 95),
+        }
+        for name, values in by_name.items()
+    }
+
+def print_summary():
+    stats = summary()
+    if not stats:
+        return
+    print(f"{'Span':<16} {'Count':>6} {'Total ms':>10} {'p50 ms':>9} {'p95 ms':>9}")
+    print("-" * 54)
+    for name, s in sorted(stats.items(), key=lambda item: -item[1]["total_ms"]):
+        print(f"{name:<16} {s['count']:>6} {s['total_ms']:10.1f} {s['p50_ms']:9.1f} {s['p95_ms']:9.1f}")
@@ -0,0 +1,206 @@
+import importlib.util
+import json
+import os
+import time
+import ocr_profiler
+
+###########################################
+# Reusable doctr OCR session: build the predictor once and share it for the whole run
+#
+# doctr (and torch with it) is only imported when the predictor is built, so runs that
+# find nothing to OCR, or only cache hits, never load it.
+
+# Named predictor configurations for --engine. "onnx-int8" runs the mobilenet models
+# through OnnxTR (doctr's ONNX Runtime port) with int8-quantised weights.
+ENGINE_PRESETS = {
+    "doctr": {},
+    "doctr-mobile": {"det_arch": "db_mobilenet_v3_large", "reco_arch": "crnn_mobilenet_v3_small"},
+    "onnx-int8": {"backend": "onnx", "det_arch": "db_mobilenet_v3_large",
+                  "reco_arch": "crnn_mobilenet_v3_small", "load_in_8_bit": True},
+}
+DEFAULT_ENGINE = "doctr"
+BENCHMARK_RESULTS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "benchmarks", "baseline.json")
+
+class OcrSession:
+    """
+    Owns a single doctr predictor so detection/recognition networks and their
+    weights are only built once per process.
+
+    Args:
+        warm_start (bool): Build the predictor immediately and run one blank page
+            through it, so the first real screenshot does not pay setup costs.
+        backend (str): "torch" for doctr itself, "onnx" for OnnxTR (same models and
+            output format, run by ONNX Runtime).
+        detection_size (int or None): Square input size of the text detector (doctr's
+            default is 1024). Larger keeps small text legible at a higher cost; torch only.
+        num_threads (int or None): CPU threads for inference (torch's process-wide
+            intra-op pool, or the intra-op pool of each ONNX Runtime session). None keeps
+            the framework default of one thread per core.
+        **predictor_kwargs: Extra arguments forwarded to ``ocr_predictor``.
+    """
+
+    def __init__(self, warm_start=False, backend="torch", detection_size=None, num_threads=None,
+                 **predictor_kwargs):
+        self.backend = backend
+        self.detection_size = detection_size
+        self.num_threads = num_threads
+        self.engine = "doctr" if backend == "torch" else "onnxtr"
+        self.predictor_kwargs = {"pretrained": True, **predictor_kwargs}
+        if backend == "onnx":
+            # OnnxTR models are always pretrained (exported weights)
+            self.predictor_kwargs.pop("pretrained")
+        self._model = None
+        if warm_start:
+            self.warm_up()
+
+    @property
+    def model(self):
+        # Built lazily on first use, then reused for every image
+        if self._model is None:
+            models = ocr_profiler.timed_import("onnxtr.models" if self.backend == "onnx" else "doctr.models")
+            start = time.perf_counter()
+            with ocr_profiler.span("model_setup"):
+                self._model = models.ocr_predictor(**self.predictor_kwargs, **self._thread_settings(models))
+                if self.detection_size and self.backend == "torch":
+                    # The DB detectors are fully convolutional, so any input size works
+                    size = (self.detection_size, self.detection_size)
+                    self._model.det_predictor.pre_processor.resize.size = size
+            ocr_profiler.add_timing("model setup", time.perf_counter() - start)
+            _install_stage_hooks(self._model)
+        return self._model
+
+    def _thread_settings(self, models):
+        # Extra ocr_predictor arguments (and torch state) limiting inference to num_threads
+        if not self.num_threads:
+            return {}
+        if self.backend == "torch":
+            ocr_profiler.timed_import("torch").set_num_threads(self.num_threads)
+            return {}
+        options = ocr_profiler.timed_import("onnxruntime").SessionOptions()
+        options.intra_op_num_threads = self.num_threads
+        options.inter_op_num_threads = 1
+        config = models.EngineConfig(session_options=options)
+        return {"det_engine_cfg": config, "reco_engine_cfg": config, "clf_engine_cfg": config}
+
+    @property
+    def model_version(self):
+        # Cache key component: a different doctr release or architecture gives different output
+        settings = dict(self.predictor_kwargs)
+        if self.detection_size:
+            settings["detection_size"] = self.detection_size
+        options = ",".join(f"{k}={v}" for k, v in sorted(settings.items()))
+        # Read from the package metadata: cache lookups must not import the framework
+        import importlib.metadata
+        package = "onnxtr" if self.backend == "onnx" else "python-doctr"
+        return f"{importlib.metadata.version(package)}[{options}]"
+
+    @property
+    def is_loaded(self):
+        return self._model is not None
+
+    def warm_up(self):
+        import numpy as np
+        blank_page = np.full((1024, 1024, 3), 255, dtype=np.uint8)
+        self.model([blank_page])
+
+    def read_arrays(self, pages):
+        """
+        Run OCR on already decoded H x W x 3 RGB arrays (e.g. from the prefetch pipeline).
+        """
+        with ocr_profiler.span("ocr", images=len(pages)):
+            return self.model(list(pages))
+
+    def recognise(self, crops):
+        """
+        Recognition only, for crops that each hold one line of text at a known place (the
+        ROI fields): the detector is skipped entirely.
+
+        Returns:
+            list of tuple: (text, confidence) per crop, in order.
+        """
+        import numpy as np
+        with ocr_profiler.span("ocr", crops=len(crops)):
+            return self.model.reco_predictor([np.ascontiguousarray(crop) for crop in crops])
+
+def _install_stage_hooks(model):
+    """
+    Time doctr's detection and recognition stages separately through torch forward hooks.
+    The hooks only read a flag while profiling is disabled.
+    """
+    for attr, name in (("det_predictor", "detect"), ("reco_predictor", "recognise")):
+        module = getattr(model, attr, None)
+        if module is None or not hasattr(module, "register_forward_pre_hook"):
+            continue
+        starts = []
+
+        def before(*_, starts=starts):
+            if ocr_profiler.is_enabled():
+                starts.append(time.perf_counter_ns())
+
+        def after(*_, starts=starts, name=name):
+            if starts:
+                start = starts.pop()
+                ocr_profiler.record(name, start, time.perf_counter_ns() - start)
+
+        module.register_forward_pre_hook(before)
+        module.register_forward_hook(after)
+
+
+# One session per predictor configuration, shared by every caller in this process
+_shared_sessions = {}
+
+def get_session(warm_start=False, engine=DEFAULT_ENGINE, **predictor_kwargs):
+    """
+    Return the process-wide OcrSession for the given predictor configuration,
+    creating it on first call. Long-running callers (notebooks, daemons, repeated
+    main() calls) therefore never construct the model twice.
+
+    engine names one of ENGINE_PRESETS; predictor_kwargs override its settings.
+    """
+    predictor_kwargs = {**ENGINE_PRESETS[engine], **predictor_kwargs}
+    key = tuple(sorted(predictor_kwargs.items()))
+    session = _shared_sessions.get(key)
+    if session is None:
+        session = OcrSession(warm_start=warm_start, **predictor_kwargs)
+        _shared_sessions[key] = session
+    elif warm_start and not session.is_loaded:
+        session.warm_up()
+    return session
+
+def engine_available(engine):
+    backend = ENGINE_PRESETS[engine].get("backend", "torch")
+    return importlib.util.find_spec("onnxtr" if backend == "onnx" else "doctr") is not None
+
+def pick_engine(results, tolerance=0.02):
+    """
+    Fastest engine whose accuracy is within tolerance of the most accurate one.
+
+    Args:
+        results (dict): engine -> {"per_image_s", "accuracy", ...}, as written by
+            benchmarks/run_benchmarks.py.
+
+    Returns:
+        str or None: An ENGINE_PRESETS name, or None if results cover none of them.
+    """
+    candidates = {engine: r for engine, r in results.items()
+                  if engine in ENGINE_PRESETS and r.get("accuracy") is not None and r.get("per_image_s")}
+    if not candidates:
+        return None
+    best_accuracy = max(r["accuracy"] for r in candidates.values())
+    accurate = [engine for engine, r in candidates.items() if r["accuracy"] >= best_accuracy - tolerance]
+    return min(accurate, key=lambda engine: candidates[engine]["per_image_s"])
+
+def resolve_engine(engine="auto", results_path=BENCHMARK_RESULTS, tolerance=0.02):
+    """
+    Turn --engine into an ENGINE_PRESETS name. "auto" picks from the recorded benchmark
+    results (engines that are not installed here are left out) and falls back to doctr
+    when there are none.
+    """
+    if engine != "auto":
+        return engine
+    if not os.path.exists(results_path):
+        return DEFAULT_ENGINE
+    with open(results_path, encoding="utf-8") as f:
+        results = {name: r for name, r in json.load(f).items()
+                   if name in ENGINE_PRESETS and engine_available(name)}
+    return pick_engine(results, tolerance) or DEFAULT_ENGINE
@@ -1,17 +1,32 @@
-import easyocr
 import time
-import torch
+# Start-up clock for --timings; easyocr, torch and cv2 are imported only when needed
+_START = time.perf_counter()
+import argparse
+import atexit
+import importlib.metadata
 import pandas as pd
 import os
 import pickle
-import cv2
-import numpy as np
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from ocr_cache import DEFAULT_CACHE_NAME, OcrCache, compact_text_boxes, expand_text_boxes, file_sha256
+from image_prefetch import load_bgr, prefetch
+from image_handle import ImageHandle
+from scroll_stitch import new_content_top
+from ocr_corrections import get_corrector
+from image_hash import dhash
+from screen_classifier import DEFAULT_TEMPLATES_NAME, ScreenClassifier
+import ocr_profiler
+
 min_conf = 0.3  # Minimum confidence to consider a word valid
 height_gap = 140  # Max vertical gap to consider words in the same row
 
 ###########################################
 # EasyOCR-based OCR and parsing for Pokémon Sleep community research screenshots
 def test_gpu():
+    easyocr = ocr_profiler.timed_import("easyocr")
+    torch = ocr_profiler.timed_import("torch")
     print("Testing GPU availability for EasyOCR")
     print("EasyOCR version:", easyocr.__version__)
     print("Torch version:", torch.__version__)
@@ -19,10 +34,167 @@ def test_gpu():
     print("Is CUDA available:", torch.cuda.is_available())
 
 ## OCR Processing
-def ocr_image_with_easyocr(img):
-    reader = easyocr.Reader(['en'], gpu=True)  # gpu=True if you have CUDA
-    results = reader.readtext(img)
-    return results
+class EasyOcrEngine:
+    """
+    One EasyOCR Reader per process, with the device chosen once.
+
+    Args:
+        languages (tuple): EasyOCR language codes.
+        gpu (bool or None): Use CUDA; None checks torch.cuda.is_available() once, when
+            the Reader is built, so CPU-only machines don't probe for a GPU on every image.
+        canvas_size (int): Longest side images are resized to before detection.
+            Smaller is faster; 1600 is plenty for phone screenshots.
+        mag_ratio (float): Magnification applied before detection.
+        num_threads (int or None): torch CPU threads (None keeps torch's default).
+        batch_size (int): Text lines recognised per forward pass.
+        **reader_kwargs: Extra arguments forwarded to ``easyocr.Reader``.
+    """
+
+    engine = "easyocr"
+
+    def __init__(self, languages=("en",), gpu=None, canvas_size=2560, mag_ratio=1.0,
+                 num_threads=None, batch_size=8, **reader_kwargs):
+        self.languages = list(languages)
+        self.gpu = gpu
+        self.canvas_size = canvas_size
+        self.mag_ratio = mag_ratio
+        self.num_threads = num_threads
+        self.batch_size = batch_size
+        self.reader_kwargs = reader_kwargs
+        self._reader = None
+
+    @property
+    def reader(self):
+        # Built lazily on first use, then reused for every image
+        if self._reader is None:
+            torch = ocr_profiler.timed_import("torch")
+            easyocr = ocr_profiler.timed_import("easyocr")
+            if self.gpu is None:
+                self.gpu = torch.cuda.is_available()
+            if self.num_threads:
+                torch.set_num_threads(self.num_threads)
+            start = time.perf_counter()
+            with ocr_profiler.span("model_setup"):
+                self._reader = easyocr.Reader(self.languages, gpu=self.gpu, verbose=False, **self.reader_kwargs)
+            ocr_profiler.add_timing("model setup", time.perf_counter() - start)
+        return self._reader
+
+    @property
+    def model_version(self):
+        # Cache key component; default settings keep the key of the original "[en]" entries
+        options = self.languages[:]
+        if self.canvas_size != 2560:
+            options.append(f"canvas={self.canvas_size}")
+        if self.mag_ratio != 1.0:
+            options.append(f"mag={self.mag_ratio}")
+        # Package metadata, so cache hits never import easyocr/torch
+        return f"{importlib.metadata.version('easyocr')}[{','.join(options)}]"
+
+    def readtext(self, image):
+        """
+        Detect and recognise the text of one image (path or BGR array).
+        """
+        with ocr_profiler.span("ocr"):
+            return self.reader.readtext(image, canvas_size=self.canvas_size, mag_ratio=self.mag_ratio,
+                                        batch_size=self.batch_size)
+
+    def readtext_batched(self, images, n_width=None, n_height=None):
+        """
+        Detect text on several images in one forward pass and return one result list
+        per image. Images must share a size (screenshots from one phone do); otherwise
+        pass n_width/n_height to have them resized to a common size first.
+        """
+        with ocr_profiler.span("ocr", images=len(images)):
+            return self.reader.readtext_batched(list(images), n_width=n_width, n_height=n_height,
+                                                canvas_size=self.canvas_size, mag_ratio=self.mag_ratio,
+                                                batch_size=self.batch_size)
+
+_engine = None
+
+def get_engine(**kwargs):
+    """
+    Return the process-wide EasyOcrEngine, creating it on first call.
+    """
+    global _engine
+    if _engine is None:
+        _engine = EasyOcrEngine(**kwargs)
+    return _engine
+
+def ocr_image_with_easyocr(img, engine=None):
+    return (engine or get_engine()).readtext(img)
+
+def ocr_images_with_easyocr(image_paths, engine=None, batch_size=8, prefetch_depth=2):
+    """
+    OCR many screenshots with one engine, batch_size images per detector pass (images of
+    one size share a pass; readtext_batched needs equal sizes). The next batches are
+    decoded in background threads while the current one is read.
+    Yields (image_path, results) in input order.
+    """
+    engine = engine or get_engine()
+    batches = [image_paths[i:i + batch_size] for i in range(0, len(image_paths), batch_size)]
+    load_batch = lambda batch: [load_bgr(img_path) for img_path in batch]
+    for batch, images in prefetch(batches, load_batch, depth=prefetch_depth):
+        results = [None] * len(images)
+        by_size = {}
+        for i, image in enumerate(images):
+            by_size.setdefault(image.shape, []).append(i)
+        with ocr_profiler.image_scope(batch):
+            for indexes in by_size.values():
+                for i, result in zip(indexes, engine.readtext_batched([images[i] for i in indexes])):
+                    results[i] = result
+        yield from zip(batch, results)
+
+def ocr_folder(image_paths, cache, engine=None, batch_size=8, prefetch_depth=2):
+    """
+    Bulk mode: EasyOCR results for many screenshots, read from the shared content cache
+    where possible; only the cache misses go through the model, batched and prefetched
+    (ocr_images_with_easyocr), and are cached in turn.
+    Yields (image_path, results) in input order.
+    """
+    engine = engine or get_engine()
+    version = engine.model_version
+    hashes = {}
+    cached = {}
+    for img_path in image_paths:
+        with ocr_profiler.image_scope(img_path), ocr_profiler.span("cache_lookup"):
+            hashes[img_path] = file_sha256(img_path)
+            cached[img_path] = cache.get_text_boxes(hashes[img_path], "easyocr", version)
+    misses = [img_path for img_path in image_paths if cached[img_path] is None]
+    fresh = ocr_images_with_easyocr(misses, engine, batch_size, prefetch_depth)
+    for img_path in image_paths:
+        results = cached[img_path]
+        if results is None:
+            _, results = next(fresh)
+            payload = compact_text_boxes(results, os.path.basename(img_path))
+            cache.put(hashes[img_path], "easyocr", version, payload)
+            results = expand_text_boxes(payload)
+        yield img_path, results
+
+def ocr_image_with_cache(img_path, cache, legacy_cache_file=None, image=None, engine=None):
+    """
+    Return EasyOCR results for img_path as [bbox, text, conf] lists, consulting the shared
+    content-addressed cache first (stored as columns, see ocr_cache.compact_text_boxes).
+    Pass the already decoded ImageHandle as image to let EasyOCR read its buffer.
+    """
+    engine = engine or get_engine()
+    with ocr_profiler.span("cache_lookup"):
+        image_hash = file_sha256(img_path)
+        version = engine.model_version
+        results = cache.get_text_boxes(image_hash, "easyocr", version)
+    if results is not None:
+        return results
+
+    if legacy_cache_file and os.path.exists(legacy_cache_file):
+        # Migrate results from the old one-pickle-per-image cache
+        with open(legacy_cache_file, "rb") as f:
+            results = pickle.load(f)
+    else:
+        results = engine.readtext(image.bgr if image is not None else img_path)
+
+    # Returned in the form a cache hit has (plain floats and lists, rounded)
+    payload = compact_text_boxes(results, os.path.basename(img_path))
+    cache.put(image_hash, "easyocr", version, payload)
+    return expand_text_boxes(payload)
 
 def print_ocr_results(ocr_results):
     print("OCR Results:")
@@ -30,12 +202,20 @@ def print_ocr_results(ocr_results):
         bbox_str = ", ".join([f"({int(x)},{int(y)})" for x, y in bbox])
         print(f" BBox: {bbox_str}, Text: '{text}', Conf: {conf:.2f}")
 
-def draw_bboxes_on_image(image_path, ocr_results, output_path):
-    # Load image
-    image = cv2.imread(image_path)
-    if image is None:
-        print(f"Could not load image: {image_path}")
-        return
+def draw_bboxes_on_image(image, ocr_results, output_path):
+    cv2 = ocr_profiler.timed_import("cv2")
+    np = ocr_profiler.timed_import("numpy")
+    # Draw on a copy of the decoded buffer: the handle's views stay untouched
+    if isinstance(image, str):
+        with ocr_profiler.span("decode"):
+            try:
+                with ImageHandle(image) as handle:
+                    image = handle.copy()
+            except ValueError as e:
+                print(e)
+                return
+    else:
+        image = image.copy()
 
     for bbox, text, conf in ocr_results:
         # Convert bbox to integer coordinates
@@ -48,60 +228,52 @@ def draw_bboxes_on_image(image_path, ocr_results, output_path):
         x, y = pts[0][0]
         cv2.putText(image, text, (x, y - 10), cv2.FONT_HERSHEY_SIMPLEX, 0.8, (0, 0, 255), 2, cv2.LINE_AA)
 
-    cv2.imwrite(output_path, image)
+    with ocr_profiler.span("write"):
+        cv2.imwrite(output_path, image)
     print(f"Overlay image saved to: {output_path}")
 
 # ---------------------------
 # Parsing logic
 # ---------------------------
 # ---------------------------
-# Step 2: Simple cleanup dictionary
+# Step 2: Cleanup (literal fixes in ocr_corrections.LITERAL_FIXES, names and sleep styles
+# against the bundled dictionaries)
 # ---------------------------
-fix_map = {
-    "Sleepl": "Sleep",
-    "Sieep": "Sleep",
-    "Emper": "Ember",
-    "Sleepl": "Sleep",
-    "Sllep": "Sleep"
-}
-
 def clean_text(t):
-    for wrong, right in fix_map.items():
-        t = t.replace(wrong, right)
-    return t.strip(" !?")
+    return get_corrector().fix(t).strip(" !?")
 
 def group_into_rows(ocr_results, row_threshold=height_gap):
     """
     Group OCR tokens into rows based on vertical alignment.
     Each result is (bbox, text, conf) where bbox=(x,y).
-    """
-    # Add vertical center for better alignment
-    results = [(bbox, text) for bbox, text, conf in ocr_results if conf > min_conf]
-    
-    # Sort by vertical center, then by x
-    results.sort(key=lambda x: (x[0][1], x[0][0]))
 
-    rows = []
-    current_row = []
-    row_start_y = None
-
-    for bbox, text in results:
-        if row_start_y is None or abs(bbox[1] - row_start_y) > row_threshold:
-            if current_row:
-                # Save finished row
-                current_row.sort(key=lambda x: x[0][0])  # sort row left-to-right
-                rows.append(current_row)
-                current_row = []
-            current_row.append((bbox, text))
-            row_start_y = bbox[1]
-        else:
-            current_row.append((bbox, text))
-
-    if current_row:
-        current_row.sort(key=lambda x: x[0][0])
-        rows.append(current_row)
+    A row starts at its topmost token and takes every token less than row_threshold
+    below it. Sorting and the left-to-right order inside rows are done with NumPy; the
+    only Python loop is one searchsorted per row.
+    """
+    np = ocr_profiler.timed_import("numpy")
+    tokens = [(bbox, text) for bbox, text, conf in ocr_results if conf > min_conf]
+    if not tokens:
+        return []
+    centres = np.array([bbox for bbox, _ in tokens], dtype=float).reshape(-1, 2)
+    xs, ys = centres[:, 0], centres[:, 1]
 
-    return rows
+    # Sort by vertical center, then by x
+    order = np.lexsort((xs, ys))
+    sorted_y = ys[order]
+    starts = [0]
+    while True:
+        next_start = int(np.searchsorted(sorted_y, sorted_y[starts[-1]] + row_threshold, side="right"))
+        if next_start >= len(order):
+            break
+        starts.append(next_start)
+    row_ids = np.zeros(len(order), dtype=int)
+    row_ids[starts[1:]] = 1
+    row_ids = np.cumsum(row_ids)
+
+    # Left-to-right inside each row (stable, so equal x keeps the vertical order)
+    order = order[np.lexsort((xs[order], row_ids))]
+    return [[tokens[i] for i in row] for row in np.split(order, starts[1:])]
 
 def parse_rows_to_table(rows):
     """
@@ -123,8 +295,9 @@ def parse_rows_to_table(rows):
                 pokemon = t.split("studied")[1].strip()
                 if pokemon.endswith("'s"):
                     pokemon = pokemon[:-2].strip()
+                pokemon = get_corrector().correct(pokemon, "pokemon")
             elif "Sleep" in t:
-                style = t.split("Sleep")[0].strip()
+                style = get_corrector().correct(t.split("Sleep")[0].strip(), "sleep_style")
             elif t.isdigit():
                 reward = t
             else:
@@ -174,7 +347,8 @@ def parse_ocr_result(ocr_results):
         for bbox, text, conf in ocr_results
     ]
 
-    rows = group_into_rows(ocr_results)
+    with ocr_profiler.span("group_rows"):
+        rows = group_into_rows(ocr_results)
     print(f"Grouped into {len(rows)} rows based on vertical alignment.")
     print("Rows detail (bbox midpoints and texts):")
     for i, row in enumerate(rows):
@@ -183,11 +357,181 @@ def parse_ocr_result(ocr_results):
     # ---------------------------
     # Step 4: Parse each row into Username / Studied / Reward
     # ---------------------------
-    df = parse_rows_to_table(rows)
+    with ocr_profiler.span("parse"):
+        df = parse_rows_to_table(rows)
 
     return df
 
+# ---------------------------
+# Scrolled lists: several overlapping captures of one community research list
+# ---------------------------
+def row_fingerprint(row):
+    return (row["Username"], row["Pokemon"], row["Sleep_Style"], str(row["Reward"]))
+
+def parse_strip(ocr_results, seen_bottom=0, seen_rows=()):
+    """
+    Parse the OCR of one capture's new strip. Rows starting above seen_bottom were in the
+    re-read margin, i.e. (partly) visible in the previous capture: they are dropped when
+    the previous capture already produced them, and kept when it only saw them cut off.
+
+    Returns:
+        tuple: (rows not seen before as a DataFrame, fingerprints of every row parsed,
+        dropped ones included, for the next capture to compare against).
+    """
+    tokens = [(convert_bbox_format(bbox), clean_text(text), conf) for bbox, text, conf in ocr_results]
+    with ocr_profiler.span("group_rows"):
+        rows = group_into_rows(tokens)
+    overlap = [row for row in rows if min(bbox[1] for bbox, _ in row) < seen_bottom]
+    with ocr_profiler.span("parse"):
+        seen_again = parse_rows_to_table(overlap)
+        fresh = parse_rows_to_table(rows[len(overlap):])
+    parsed = {row_fingerprint(row) for _, row in seen_again.iterrows()}
+    parsed |= {row_fingerprint(row) for _, row in fresh.iterrows()}
+    if len(seen_again):
+        keep = [row_fingerprint(row) not in seen_rows for _, row in seen_again.iterrows()]
+        seen_again = seen_again[keep]
+    return pd.concat([seen_again, fresh], ignore_index=True), parsed
+
+def ocr_scrolled_captures(image_paths, engine=None, margin=200):
+    """
+    Read consecutive scroll captures of one list as a single table. Each capture is
+    matched against the previous one (scroll_stitch) and only the rows below what was
+    already seen, plus a margin of margin pixels for rows the previous capture cut off,
+    go through EasyOCR. Rows the previous capture already produced are dropped. When the
+    scroll distance cannot be established, the whole capture is read and every row is
+    checked against the previous capture.
+
+    Returns:
+        pd.DataFrame: The parse_rows_to_table columns plus the capture each row came from.
+    """
+    engine = engine or get_engine()
+    frames = []
+    previous_gray = None
+    previous_rows = set()
+    for img_path in image_paths:
+        with ocr_profiler.image_scope(img_path), ImageHandle(img_path) as image:
+            seen_bottom = 0
+            if previous_gray is not None:
+                with ocr_profiler.span("stitch"):
+                    seen_bottom = new_content_top(previous_gray, image.gray)
+            top = max(0, seen_bottom - margin)
+            results = engine.readtext(image.bgr[top:])
+            if previous_gray is not None and seen_bottom == 0:
+                # No confirmed overlap: any row may be one the previous capture showed
+                seen_bottom = image.gray.shape[0]
+            previous_gray = image.gray
+        # Back to full-frame coordinates
+        results = [([[x, y + top] for x, y in bbox], text, conf) for bbox, text, conf in results]
+        with ocr_profiler.image_scope(img_path):
+            df, previous_rows = parse_strip(results, seen_bottom, previous_rows)
+        print(f"{img_path}: OCR'd rows {top}+ of the capture, {len(df)} new list rows")
+        df.insert(0, "Image", os.path.basename(img_path))
+        frames.append(df)
+    return pd.concat(frames, ignore_index=True) if frames else parse_rows_to_table([])
+
+def reparse_cached_results(cache, output_dir):
+    """
+    Parse every EasyOCR result in the cache again (the latest per image, whatever the
+    model version) without loading EasyOCR, e.g. after a correction dictionary change.
+    Rewrites each image's <image>_ocr_result.csv in output_dir plus one CSV of all rows.
+    Results cached as [bbox, text, conf] lists are moved to the columnar form on the way.
+
+    Returns:
+        pd.DataFrame: Every parsed row, with the image it came from.
+    """
+    frames = []
+    for image_hash, engine, model_version, payload in cache.iter_latest(("easyocr",)):
+        results = expand_text_boxes(payload)
+        image = payload.get("image") if isinstance(payload, dict) else None
+        if not isinstance(payload, dict):
+            cache.put_text_boxes(image_hash, engine, model_version, results)
+        with ocr_profiler.image_scope(image or image_hash):
+            df = parse_ocr_result(results)
+        if image:
+            df.to_csv(os.path.join(output_dir, f"{image}_ocr_result.csv"), index=False)
+        # Images cached before their name was recorded are identified by content hash
+        df.insert(0, "Image", image or image_hash)
+        frames.append(df)
+    all_rows = pd.concat(frames, ignore_index=True) if frames else parse_rows_to_table([])
+    all_rows.to_csv(os.path.join(output_dir, "community_research_reparsed.csv"), index=False)
+    return all_rows
+
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="EasyOCR test run on a community research screenshot.")
+    parser.add_argument("--profile", action="store_true",
+                        help="Time every stage; writes a Chrome trace next to the outputs and prints p50/p95")
+    parser.add_argument("--reparse", action="store_true",
+                        help="Parse every cached EasyOCR result again (e.g. after a correction dictionary change) without "
+                             "running OCR; rewrites the per-image CSVs and community_research_reparsed.csv")
+    parser.add_argument("--timings", action="store_true",
+                        help="Print start-up, import and model setup times and the total run time")
+    parser.add_argument("--scroll", metavar="FOLDER",
+                        help="Treat the screenshots in FOLDER (in name order) as scroll captures of one list: "
+                             "OCR only the new part of each and write one de-duplicated CSV")
+    parser.add_argument("--folder", metavar="FOLDER",
+                        help="Read every screenshot in FOLDER, batch_size images per detector pass and cached "
+                             "results reused, and write one CSV of all parsed rows")
+    parser.add_argument("--batch-size", type=int, default=8,
+                        help="Screenshots per detector pass in --folder mode (default: 8)")
+    parser.add_argument("--templates", default=None,
+                        help="Screen template file that screenshots with parsed rows are added to as Community "
+                             f"Research (default: {DEFAULT_TEMPLATES_NAME} in the output folder)")
+    parser.add_argument("--cpu", action="store_true", help="Run on the CPU even if CUDA is available")
+    parser.add_argument("--threads", type=int, default=None, help="torch CPU threads (default: torch's choice)")
+    parser.add_argument("--canvas-size", type=int, default=2560,
+                        help="Longest image side for text detection (default: 2560; 1600 is faster on CPU)")
+    parser.add_argument("--mag-ratio", type=float, default=1.0, help="Detection magnification (default: 1.0)")
+    args = parser.parse_args()
+    if args.profile:
+        ocr_profiler.enable()
+    if args.timings:
+        atexit.register(ocr_profiler.print_timings, _START)
+    engine = get_engine(gpu=False if args.cpu else None, canvas_size=args.canvas_size,
+                        mag_ratio=args.mag_ratio, num_threads=args.threads)
+
+    if args.scroll:
+        exts = ('.jpg', '.jpeg', '.png')
+        captures = sorted(os.path.join(args.scroll, f) for f in os.listdir(args.scroll) if f.lower().endswith(exts))
+        scroll_df = ocr_scrolled_captures(captures, engine)
+        scroll_csv = os.path.join(args.scroll, "community_research_scroll.csv")
+        scroll_df.to_csv(scroll_csv, index=False)
+        if len(scroll_df):
+            # Every capture of the scrolled list is a community research screen
+            classifier = ScreenClassifier(args.templates or os.path.join(args.scroll, DEFAULT_TEMPLATES_NAME))
+            for capture in captures:
+                classifier.learn(dhash(capture), "Community Research")
+            classifier.save()
+        print(scroll_df)
+        print(f"{len(scroll_df)} rows from {len(captures)} captures saved to {scroll_csv}")
+        if args.profile:
+            ocr_profiler.write_chrome_trace(os.path.join(args.scroll, "profile_trace.json"))
+            ocr_profiler.print_summary()
+        sys.exit(0)
+
+    if args.folder:
+        exts = ('.jpg', '.jpeg', '.png')
+        screenshots = sorted(os.path.join(args.folder, f) for f in os.listdir(args.folder) if f.lower().endswith(exts))
+        classifier = ScreenClassifier(args.templates or os.path.join(args.folder, DEFAULT_TEMPLATES_NAME))
+        frames = []
+        with OcrCache(os.path.join(args.folder, DEFAULT_CACHE_NAME)) as cache:
+            for img_path, results in ocr_folder(screenshots, cache, engine, args.batch_size):
+                with ocr_profiler.image_scope(img_path):
+                    df = parse_ocr_result(results)
+                if len(df):
+                    classifier.learn(dhash(img_path), "Community Research")
+                df.insert(0, "Image", os.path.basename(img_path))
+                frames.append(df)
+        classifier.save()
+        folder_df = pd.concat(frames, ignore_index=True) if frames else parse_rows_to_table([])
+        folder_csv = os.path.join(args.folder, "community_research_folder.csv")
+        folder_df.to_csv(folder_csv, index=False)
+        print(folder_df)
+        print(f"{len(folder_df)} rows from {len(screenshots)} screenshots saved to {folder_csv}")
+        if args.profile:
+            ocr_profiler.write_chrome_trace(os.path.join(args.folder, "profile_trace.json"))
+            ocr_profiler.print_summary()
+        sys.exit(0)
+
     start_time = time.time()
     # test_gpu()
 
@@ -198,35 +542,52 @@ if __name__ == "__main__":
     if not os.path.exists(ocr_result_folder):
         os.makedirs(ocr_result_folder)
 
+    if args.reparse:
+        with OcrCache(os.path.join(ocr_result_folder, DEFAULT_CACHE_NAME)) as cache:
+            reparsed_df = reparse_cached_results(cache, ocr_result_folder)
+        print(reparsed_df)
+        print(f"{len(reparsed_df)} rows re-parsed from the cache into {ocr_result_folder}")
+        if args.profile:
+            ocr_profiler.write_chrome_trace(os.path.join(ocr_result_folder, "reparse_profile_trace.json"))
+            ocr_profiler.print_summary()
+        sys.exit(0)
+
     print(f"Processing image: {img}")
-    ocr_cache_file = ocr_result_folder + img + ".easyocr.pkl"
-    if os.path.exists(ocr_cache_file):
-        print(f"Loading OCR results from cache: {ocr_cache_file}")
-        with open(ocr_cache_file, "rb") as f:
-            results = pickle.load(f)
-        ocr_completed_time = time.time()
-        print(f"OCR Load time: {ocr_completed_time - start_time:.2f} seconds")
-    else:
-        results = ocr_image_with_easyocr(img_path)
-        with open(ocr_cache_file, "wb") as f:
-            pickle.dump(results, f)
-        print(f"OCR results saved to cache: {ocr_cache_file}")
-        ocr_completed_time = time.time()
-        print(f"Total OCR time: {ocr_completed_time - start_time:.2f} seconds")
+    legacy_cache_file = ocr_result_folder + img + ".easyocr.pkl"
+    # Decoded once: EasyOCR and the overlay both use this buffer
+    with ocr_profiler.image_scope(img_path), ocr_profiler.span("decode"):
+        image = ImageHandle(img_path)
+    with OcrCache(os.path.join(ocr_result_folder, DEFAULT_CACHE_NAME)) as cache, ocr_profiler.image_scope(img_path):
+        results = ocr_image_with_cache(img_path, cache, legacy_cache_file, image, engine)
+    ocr_completed_time = time.time()
+    print(f"Total OCR time (cached or computed): {ocr_completed_time - start_time:.2f} seconds")
 
     print_ocr_results(results)
     overlay_path = os.path.join(ocr_result_folder, f"{img}_overlay.jpg")
-    draw_bboxes_on_image(img_path, results, overlay_path)
+    with ocr_profiler.image_scope(img_path):
+        draw_bboxes_on_image(image, results, overlay_path)
+    image.close()
 
     ocr_csv_file = os.path.join(ocr_result_folder, f"{img}_ocr_result.csv")
     if os.path.exists(ocr_csv_file):
         print(f"Loading extracted info from CSV: {ocr_csv_file}")
         extracted_info_df = pd.read_csv(ocr_csv_file)
     else:
-        extracted_info_df = parse_ocr_result(results)
+        with ocr_profiler.image_scope(img_path):
+            extracted_info_df = parse_ocr_result(results)
         extracted_info_df.to_csv(ocr_csv_file, index=False)
         print(f"Extracted info saved to CSV: {ocr_csv_file}")
 
     print(f"Text formatting time: {time.time() - ocr_completed_time:.2f} seconds")
+
+    if len(extracted_info_df):
+        # Confirmed community research screen: a template for the pre-classifier
+        classifier = ScreenClassifier(args.templates or os.path.join(ocr_result_folder, DEFAULT_TEMPLATES_NAME))
+        classifier.learn(dhash(img_path), "Community Research")
+        classifier.save()
     
-    print(extracted_info_df)
\ No newline at end of file
+    print(extracted_info_df)
+
+    if args.profile:
+        ocr_profiler.write_chrome_trace(os.path.join(ocr_result_folder, f"{img}_profile_trace.json"))
+        ocr_profiler.print_summary()
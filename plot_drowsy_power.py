@@ -2,18 +2,43 @@ import pandas as pd
 import argparse
 import os
 import matplotlib.pyplot as plt
-from datetime import datetime
+import sys
+from datetime import datetime, timedelta
+from result_store import CSV_LAYOUTS, DEFAULT_STORE_NAME, ResultStore
 
 parser = argparse.ArgumentParser(description='Plot Drowsy Power vs Research Experience and Dream Shards.')
 parser.add_argument('folder', help='Folder containing report_info.csv and session_info.csv')
+parser.add_argument('--start', help='First date to plot (YYYY-MM-DD, needs results.sqlite)')
+parser.add_argument('--end', help='Last date to plot (YYYY-MM-DD, needs results.sqlite)')
 args = parser.parse_args()
 
 report_csv = os.path.join(args.folder, 'report_info.csv')
 session_csv = os.path.join(args.folder, 'session_info.csv')
+store_path = os.path.join(args.folder, DEFAULT_STORE_NAME)
 
-# Read CSV files
-report_df = pd.read_csv(report_csv)
-session_df = pd.read_csv(session_csv)
+if os.path.exists(store_path):
+    # Indexed store written by read_report_session_info.py: only the requested dates are read
+    # A session's report is dated the next day, so the report range is one day later
+    def next_day(date_iso):
+        if date_iso is None:
+            return None
+        return (datetime.strptime(date_iso, '%Y-%m-%d') + timedelta(days=1)).strftime('%Y-%m-%d')
+
+    # Store rows carry every image type's columns: keep the CSV ones so the merge doesn't clash
+    def query(image_type, start, end):
+        columns = CSV_LAYOUTS[image_type][2]
+        return pd.DataFrame(store.query(image_type, start, end), columns=list(columns))
+
+    with ResultStore(store_path) as store:
+        report_df = query('Report', next_day(args.start), next_day(args.end))
+        session_df = query('Session', args.start, args.end)
+else:
+    # Read CSV files
+    report_df = pd.read_csv(report_csv)
+    session_df = pd.read_csv(session_csv)
+
+if report_df.empty or session_df.empty:
+    sys.exit('No Report and Session results to plot' + (' in the requested dates' if args.start or args.end else ''))
 
 # Standardize dates in report (YYYY-MM-DD) Report always comes on the next day!
 report_df['date_std'] = pd.to_datetime(report_df['date'], format='%Y-%m-%d') - pd.Timedelta(days=1)
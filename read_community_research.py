@@ -1,45 +1,180 @@
+import argparse
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
 import cv2
 import pytesseract
 import pandas as pd
-from PIL import Image
+from ocr_cache import DEFAULT_CACHE_NAME, OcrCache, file_sha256
+from image_prefetch import load_bgr
+from image_hash import dhash
+from screen_classifier import DEFAULT_TEMPLATES_NAME, ScreenClassifier
+import ocr_profiler
 
-# Path to your screenshot
-image_path = "d:\\Personal\\Jogos\\PKMN_Sleep\\photos\\2025_08_01_to_09_09\\Screenshot_2025-09-05-15-18-29-711_jp.pokemon.pokemonsleep.jpg"
+###########################################
+# Tesseract OCR of Pokémon Sleep community research screenshots, a folder at a time
+#
+# Every pytesseract call runs a separate, single-threaded tesseract process, so a thread
+# pool keeps one process per core busy. Each thread keeps its grayscale/threshold buffers
+# and reuses them for the next screenshot of the same size.
 
-# Load image
-img = cv2.imread(image_path)
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.bmp', '.tiff')
+DEFAULT_OUTPUT_NAME = "community_research.csv"
 
-# Optional: preprocess for better OCR (grayscale + threshold)
-gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
-_, thresh = cv2.threshold(gray, 150, 255, cv2.THRESH_BINARY)
+_buffers = threading.local()
 
-# Run OCR
-text = pytesseract.image_to_string(thresh, lang="eng")
+def preprocess(img):
+    # Optional: preprocess for better OCR (grayscale + threshold)
+    # Output arrays are per-thread and reused while the image size stays the same
+    shape = img.shape[:2]
+    if getattr(_buffers, "shape", None) != shape:
+        _buffers.gray = None
+        _buffers.thresh = None
+        _buffers.shape = shape
+    _buffers.gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY, dst=_buffers.gray)
+    _, _buffers.thresh = cv2.threshold(_buffers.gray, 150, 255, cv2.THRESH_BINARY, dst=_buffers.thresh)
+    return _buffers.thresh
 
-# Split into lines and filter
-lines = [line.strip() for line in text.split("\n") if line.strip()]
+def tesseract_words(thresh):
+    # Words with boxes and confidences, in Tesseract's reading order
+    data = pytesseract.image_to_data(thresh, lang="eng", output_type=pytesseract.Output.DICT)
+    keys = ("text", "conf", "left", "top", "width", "height", "block_num", "par_num", "line_num")
+    return {key: list(data[key]) for key in keys}
 
-# Extract rows (heuristic parsing)
-data = []
-i = 0
-while i < len(lines):
-    line = lines[i]
-    if "I studied" in line:
-        # Example: "riddelhx I studied Swablu’s Roosting Sleep!"
-        parts = line.split("I studied")
-        username = parts[0].strip()
-        studied = parts[1].replace("!", "").strip()
+def words_to_lines(words):
+    # Rebuild the text lines image_to_string would have produced
+    lines = {}
+    for i, text in enumerate(words["text"]):
+        if text.strip():
+            key = (words["block_num"][i], words["par_num"][i], words["line_num"][i])
+            lines.setdefault(key, []).append(text.strip())
+    return [" ".join(parts) for parts in lines.values()]
 
-        # Next line should contain reward
-        reward = None
-        if i+1 < len(lines) and "Reward" in lines[i+1]:
-            reward_line = lines[i+1]
-            reward = reward_line.replace("Reward", "").strip()
+def tesseract_model_version():
+    # The preprocessing is part of the cache key: different thresholds give different words
+    return f"{pytesseract.get_tesseract_version()}[gray,thresh150,eng]"
 
-        data.append([username, studied, reward])
-    i += 1
+def ocr_words_with_cache(image_path, cache=None, model_version=None):
+    with ocr_profiler.span("cache_lookup"):
+        image_hash = file_sha256(image_path) if cache is not None else None
+        model_version = model_version or tesseract_model_version()
+        words = cache.get(image_hash, "tesseract", model_version) if cache is not None else None
+    if words is None:
+        # Load image
+        with ocr_profiler.span("decode"):
+            img = load_bgr(image_path)
+        with ocr_profiler.span("preprocess"):
+            thresh = preprocess(img)
+        # Run OCR
+        with ocr_profiler.span("ocr"):
+            words = tesseract_words(thresh)
+        if cache is not None:
+            cache.put(image_hash, "tesseract", model_version, words)
+    return words
 
-# Convert to DataFrame
-df = pd.DataFrame(data, columns=["Username", "Studied", "Reward"])
+def ocr_images_with_tesseract(image_paths, cache=None, workers=None):
+    """
+    OCR many screenshots on a thread pool (one tesseract process per thread).
+    Yields (image_path, words) in input order; an image that fails yields its exception
+    instead of words.
+    """
+    model_version = tesseract_model_version()  # One `tesseract --version` call per run
 
-print(df)
+    def read(image_path):
+        with ocr_profiler.image_scope(image_path):
+            try:
+                return ocr_words_with_cache(image_path, cache, model_version)
+            except Exception as e:
+                return e
+
+    with ThreadPoolExecutor(max_workers=workers or os.cpu_count(), thread_name_prefix="tesseract") as executor:
+        yield from zip(image_paths, executor.map(read, image_paths))
+
+def get_image_files(path):
+    # A single screenshot, or every screenshot in a folder (sorted, so rows come out in capture order)
+    if os.path.isfile(path):
+        return [path]
+    return sorted(os.path.join(path, f) for f in os.listdir(path) if f.lower().endswith(IMAGE_EXTENSIONS))
+
+def parse_community_lines(lines):
+    # Extract rows (heuristic parsing)
+    data = []
+    i = 0
+    while i < len(lines):
+        line = lines[i]
+        if "I studied" in line:
+            # Example: "riddelhx I studied Swablu’s Roosting Sleep!"
+            parts = line.split("I studied")
+            username = parts[0].strip()
+            studied = parts[1].replace("!", "").strip()
+
+            # Next line should contain reward
+            reward = None
+            if i+1 < len(lines) and "Reward" in lines[i+1]:
+                reward_line = lines[i+1]
+                reward = reward_line.replace("Reward", "").strip()
+
+            data.append([username, studied, reward])
+        i += 1
+
+    # Convert to DataFrame
+    return pd.DataFrame(data, columns=["Username", "Studied", "Reward"])
+
+def main():
+    parser = argparse.ArgumentParser(description="Tesseract OCR of community research screenshots.")
+    parser.add_argument("path", help="Screenshot, or folder of screenshots")
+    parser.add_argument("--output", default=None,
+                        help=f"CSV file for the parsed rows (default: <folder>/{DEFAULT_OUTPUT_NAME})")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="Parallel tesseract processes (default: number of CPU cores)")
+    parser.add_argument("--cache", default=None, help=f"OCR result cache file (default: <folder>/{DEFAULT_CACHE_NAME})")
+    parser.add_argument("--no-cache", action="store_true", help="Always run OCR")
+    parser.add_argument("--templates", default=None,
+                        help="Screen template file that screenshots with parsed rows are added to as Community "
+                             f"Research (default: <folder>/{DEFAULT_TEMPLATES_NAME}); point it at the one in "
+                             "read_report_session_info's output folder to have those screens skipped there")
+    parser.add_argument("--profile", action="store_true",
+                        help="Time every stage; writes profile_trace.json next to the output and prints p50/p95")
+    args = parser.parse_args()
+    if args.profile:
+        ocr_profiler.enable()
+
+    folder = args.path if os.path.isdir(args.path) else os.path.dirname(os.path.abspath(args.path))
+    output = args.output or os.path.join(folder, DEFAULT_OUTPUT_NAME)
+    image_files = get_image_files(args.path)
+    print(f"Found {len(image_files)} images.")
+
+    cache = None if args.no_cache else OcrCache(args.cache or os.path.join(folder, DEFAULT_CACHE_NAME))
+    classifier = ScreenClassifier(args.templates or os.path.join(folder, DEFAULT_TEMPLATES_NAME))
+    frames = []
+    for image_path, words in ocr_images_with_tesseract(image_files, cache, args.workers):
+        if isinstance(words, Exception):
+            print(f"Failed to process {image_path}: {words}")
+            continue
+        # Split into lines and filter
+        with ocr_profiler.image_scope(image_path), ocr_profiler.span("parse"):
+            lines = [line for line in words_to_lines(words) if line]
+            df = parse_community_lines(lines)
+        df.insert(0, "Image", os.path.basename(image_path))
+        print(f"{image_path}: {len(df)} rows")
+        frames.append(df)
+        if len(df):
+            # Confirmed community research screen: a template for the pre-classifier
+            with ocr_profiler.image_scope(image_path), ocr_profiler.span("learn"):
+                classifier.learn(dhash(image_path), "Community Research")
+    if cache is not None:
+        cache.close()
+    classifier.save()
+
+    df = pd.concat(frames, ignore_index=True) if frames else parse_community_lines([])
+    with ocr_profiler.span("write"):
+        df.to_csv(output, index=False)
+    print(df)
+    print(f"Saved {len(df)} rows to {output}")
+
+    if args.profile:
+        ocr_profiler.write_chrome_trace(os.path.join(os.path.dirname(os.path.abspath(output)), "profile_trace.json"))
+        ocr_profiler.print_summary()
+
+if __name__ == "__main__":
+    main()
@@ -1,41 +1,99 @@
+import time
+# Start-up clock for --timings. The OCR frameworks (doctr/torch, cv2) are only imported
+# once there is an image to OCR, so a run with nothing new to do starts in milliseconds.
+_START = time.perf_counter()
 import argparse
+import atexit
+import calendar
 import csv
+import itertools
 import os
+import queue
 import re
-from doctr.io import DocumentFile
-from doctr.models import ocr_predictor
-
-def get_report_info(extracted_text):
-    # Use regex to extract values
-    pokemon_seen = re.search(r'Pokémon Seen\s*(\d+)', extracted_text)
-    research_exp = re.search(r'Research EXP[^\d]*([0-9,]+)', extracted_text)
-    multiplier = re.search(r'Bonus\s*x?([0-9.]+)', extracted_text)
-    dream_shards = re.search(r'Dream Shards[^\d]*([0-9,]+)', extracted_text)
-    return {
-        "pokemon_seen": int(pokemon_seen.group(1)) if pokemon_seen else None,
-        "research_exp": int(research_exp.group(1).replace(',', '')) if research_exp else None,
-        "exp_multiplier": float(multiplier.group(1)) if multiplier else None,
-        "dream_shards": int(dream_shards.group(1).replace(',', '')) if dream_shards else None,
-    }
+import threading
+from ocr_cache import DEFAULT_CACHE_NAME, OcrCache, file_sha256, render_page_export
+from ocr_session import ENGINE_PRESETS, engine_available, get_session, resolve_engine
+from field_extractor import FLOAT_FIELDS, REPORT_FIELDS, SESSION_FIELDS, extract_fields
+import ocr_profiler
+from image_hash import dhash
+from screen_classifier import DEFAULT_TEMPLATES_NAME, FAR_FROM_APP_SCREENS, ScreenClassifier
+from result_store import DEFAULT_STORE_NAME, VALUE_COLUMNS, ResultStore
+from result_journal import DEFAULT_JOURNAL_NAME, ResultJournal, read_journal
+from roi_layouts import ROI_LAYOUTS, text_line
+from image_prefetch import load_rgb, prefetch
+from image_handle import ImageHandle, open_image, path_of
+from near_duplicates import NearDuplicateIndex
+
+REPORT_PATTERNS = {
+    "pokemon_seen": re.compile(r'Pokémon Seen\s*(\d+)'),
+    "research_exp": re.compile(r'Research EXP[^\d]*([0-9,]+)'),
+    "exp_multiplier": re.compile(r'Bonus\s*x?([0-9.]+)'),
+    "dream_shards": re.compile(r'Dream Shards[^\d]*([0-9,]+)'),
+}
+SESSION_DATE_PATTERN = re.compile(r'([A-Za-z]+,?\s+[A-Za-z]+\s+\d{1,2},\s+\d{4})')
+SESSION_NUMBER_PATTERN = re.compile(r'Session\s*(\d+)')
+NUMBER_PATTERN = re.compile(r'\d[\d,]*')
+
+def get_report_info(extracted_text, page=None):
+    # Label -> nearest number by box geometry when the word boxes are available
+    found = extract_fields(page, REPORT_FIELDS) if page is not None else {}
+    fields = {}
+    confidence = {}
+    for field, pattern in REPORT_PATTERNS.items():
+        if field in found:
+            fields[field], confidence[field] = found[field]
+            continue
+        # Use regex to extract values
+        match = pattern.search(extracted_text)
+        if match is None:
+            fields[field] = None
+        elif field == "exp_multiplier":
+            fields[field] = float(match.group(1))
+        else:
+            fields[field] = int(match.group(1).replace(',', ''))
+        confidence[field] = None
+    return {**fields, "field_confidence": confidence}
+
+def session_values_plausible(drowsy_power, snorlax_strength, sleep_score):
+    return not (drowsy_power < 100_000 or snorlax_strength < 1_000 or sleep_score < 50 or sleep_score > 150)
+
+def report_values_plausible(pokemon_seen, research_exp, exp_multiplier, dream_shards):
+    return (1 <= pokemon_seen <= 60 and 1 <= research_exp <= 200_000
+            and 1.0 <= exp_multiplier <= 3.0 and 1 <= dream_shards <= 500_000)
+
+def session_values_consistent(drowsy_power, snorlax_strength, sleep_score):
+    # Drowsy power is strength x score; a misread digit almost always breaks this
+    return abs(drowsy_power - snorlax_strength * sleep_score) <= 0.01 * drowsy_power
 
-def get_session_info(extracted_text):
+def get_session_info(extracted_text, page=None):
     # Extract fields
-    date_match = re.search(r'([A-Za-z]+,?\s+[A-Za-z]+\s+\d{1,2},\s+\d{4})', extracted_text)
-    session_match = re.search(r'Session\s*(\d+)', extracted_text)
+    date_match = SESSION_DATE_PATTERN.search(extracted_text)
+    session_match = SESSION_NUMBER_PATTERN.search(extracted_text)
 
-    # Extract all numbers in order (remove commas)
-    all_numbers = [int(n.replace(',', '')) for n in re.findall(r'\d[\d,]*', extracted_text)]
+    # Label -> nearest number by box geometry when the word boxes are available
+    found = extract_fields(page, SESSION_FIELDS) if page is not None else {}
 
+    # Fallback: numbers in reading order (remove commas)
+    all_numbers = [int(n.replace(',', '')) for n in NUMBER_PATTERN.findall(extracted_text)]
     print(f"Extracted numbers: {all_numbers}")
-    
-    # Apply heuristics to classify values
-    drowsy_power = all_numbers[3]  # next((n for n in all_numbers if n > 1_000_000), None)
-    snorlax_strength = all_numbers[4] # next((n for n in all_numbers if 10_000 < n < 1_000_000), None)
-    sleep_score = all_numbers[5] # 
-    
-    if drowsy_power < 100_000 or snorlax_strength < 1_000 or sleep_score < 50 or sleep_score > 150:
+    positions = {"drowsy_power": 3, "snorlax_strength": 4, "sleep_score": 5}
+
+    values = {}
+    confidence = {}
+    for field in SESSION_FIELDS:
+        if field in found:
+            values[field], confidence[field] = found[field]
+        else:
+            position = positions[field]
+            values[field] = all_numbers[position] if len(all_numbers) > position else None
+            confidence[field] = None
+    drowsy_power = values["drowsy_power"]
+    snorlax_strength = values["snorlax_strength"]
+    sleep_score = values["sleep_score"]
+
+    complete = drowsy_power and snorlax_strength and sleep_score
+    if complete and not session_values_plausible(drowsy_power, snorlax_strength, sleep_score):
         print(f"Warning! Invalid values detected: drowsy_power={drowsy_power}, snorlax_strength={snorlax_strength}, sleep_score={sleep_score}")
-            
 
     return {
         "image_type": "Session",
@@ -44,23 +102,19 @@ def get_session_info(extracted_text):
         "drowsy_power": drowsy_power,
         "snorlax_strength": snorlax_strength,
         "sleep_score": sleep_score,
+        "field_confidence": confidence,
         "raw_text": extracted_text,
-        "status": "OK" if drowsy_power and snorlax_strength and sleep_score else "Incomplete"
+        "status": "OK" if complete else "Incomplete"
     }
 
-def extract_info_with_doctr(image_path):
-    model = ocr_predictor(pretrained=True)
-    doc = DocumentFile.from_images(image_path)
-    result = model(doc)
-    extracted_text = result.render()
-
+def classify_extracted_text(extracted_text, image_path, page=None):
     # Extract date from filename
     filename = os.path.basename(image_path)
     date_match = re.search(r"Screenshot_(\d{4}-\d{2}-\d{2})", filename)
     date = date_match.group(1) if date_match else "Unknown"
 
     if "Sleep Research Result" in extracted_text:
-        fields = get_report_info(extracted_text)
+        fields = get_report_info(extracted_text, page)
         return {
             "image_type": "Report",
             "date": date,
@@ -69,7 +123,7 @@ def extract_info_with_doctr(image_path):
             "status": "OK"
         }
     elif "Session" in extracted_text:
-        fields = get_session_info(extracted_text)
+        fields = get_session_info(extracted_text, page)
         return {
             "image_type": "Session",
             **fields,
@@ -78,109 +132,919 @@ def extract_info_with_doctr(image_path):
     else:
         return {
             "image_type": "Unknown",
+            "raw_text": extracted_text,
             "status": "Error"
         }
 
-def get_image_files(folder):
-    exts = ('.jpg', '.jpeg', '.png', '.bmp', '.tiff')
-    return [os.path.join(folder, f) for f in os.listdir(folder) if f.lower().endswith(exts)]
+def template_label(info):
+    # Community research screens come out of the parsers as Unknown; their "I studied"
+    # rows still identify them for the pre-classifier
+    if info["image_type"] == "Unknown" and "I studied" in info.get("raw_text", ""):
+        return "Community Research"
+    return info["image_type"]
+
+def load_batch_for_ocr(images, session, cache=None, content_hashes=None):
+    """
+    Everything before inference: hash and look up each image in the cache, and decode the
+    cache misses to RGB arrays. Safe to run in a prefetch thread.
+
+    Args:
+        images (list): Paths, or ImageHandles already decoded by an earlier stage, whose
+            buffer is used as is. Handles are closed here once their pixels are taken.
+        content_hashes (dict): Path -> content hash already computed by the caller;
+            only images missing from it are hashed here.
+
+    Returns:
+        tuple: (hashes, pages, arrays) - cached page exports (None for misses) and
+        index -> decoded array for the misses.
+    """
+    pages = [None] * len(images)
+    hashes = [None] * len(images)
+    arrays = {}
+    with ocr_profiler.image_scope([path_of(image) for image in images]):
+        for i, image in enumerate(images):
+            if cache is not None:
+                with ocr_profiler.span("cache_lookup"):
+                    image_path = path_of(image)
+                    known = content_hashes.get(image_path) if content_hashes else None
+                    hashes[i] = known or file_sha256(image_path)
+                    pages[i] = cache.get_page(hashes[i], session.engine, session.model_version)
+            if pages[i] is None:
+                with ocr_profiler.span("load_images"):
+                    arrays[i] = load_rgb(image) if isinstance(image, str) else image.rgb
+            if not isinstance(image, str):
+                image.close()
+    return hashes, pages, arrays
+
+def ocr_loaded_batch(loaded, session, cache=None):
+    """
+    Run the predictor once over the decoded cache misses of a loaded batch and
+    return one doctr page export per image.
+    """
+    hashes, pages, arrays = loaded
+    missing = sorted(arrays)
+    if missing:
+        result = session.read_arrays([arrays[i] for i in missing])
+        with ocr_profiler.span("export"):
+            for i, page in zip(missing, result.pages):
+                pages[i] = page.export()
+                if cache is not None:
+                    cache.put_page(hashes[i], session.engine, session.model_version, pages[i])
+    return pages
+
+def ocr_pages_with_cache(images, session, cache=None, content_hashes=None):
+    """
+    Return one doctr page export per image (path or ImageHandle), reading cached results by
+    image content and running the predictor (in a single call) only for the cache misses.
+    """
+    return ocr_loaded_batch(load_batch_for_ocr(images, session, cache, content_hashes), session, cache)
+
+def ocr_source(session):
+    # Which cached page a full-frame result was parsed from, for --reparse to read back
+    return f"{session.engine}/{session.model_version}"
+
+def extract_info_with_doctr(image, session=None, cache=None, content_hash=None):
+    # Reuse the shared predictor instead of rebuilding it for every screenshot
+    if session is None:
+        session = get_session()
+    image_path = path_of(image)
+    with ocr_profiler.image_scope(image_path):
+        page = ocr_pages_with_cache([image], session, cache, {image_path: content_hash})[0]
+        with ocr_profiler.span("render"):
+            extracted_text = render_page_export(page)
+        with ocr_profiler.span("parse"):
+            return {**classify_extracted_text(extracted_text, image_path, page), "ocr_source": ocr_source(session)}
+
+def extract_info_batch(images, session=None, batch_size=8, cache=None, prefetch_depth=0, content_hashes=None):
+    """
+    Run OCR on images (paths or ImageHandles) in groups of batch_size (one predictor call
+    per group) and yield (image_path, info) in input order. content_hashes (path -> hash)
+    spares the cache lookup from hashing files the caller has already hashed.
+
+    With prefetch_depth > 0, up to that many upcoming batches are hashed, looked up and
+    decoded by background threads while the model works on the current one.
+    """
+    if session is None:
+        session = get_session()
+    # Batches are cut lazily, so images can be any iterable (e.g. a directory scan)
+    batches = chunked(images, max(1, batch_size))
+    loader = lambda batch: load_batch_for_ocr(batch, session, cache, content_hashes)
+    for batch, loaded in prefetch(batches, loader, workers=2, depth=prefetch_depth):
+        batch = [path_of(image) for image in batch]
+        with ocr_profiler.image_scope(batch):
+            pages = ocr_loaded_batch(loaded, session, cache)
+        for img_path, page in zip(batch, pages):
+            with ocr_profiler.image_scope(img_path):
+                with ocr_profiler.span("render"):
+                    extracted_text = render_page_export(page)
+                with ocr_profiler.span("parse"):
+                    info = classify_extracted_text(extracted_text, img_path, page)
+            yield img_path, {**info, "ocr_source": ocr_source(session)}
+
+# The recogniser reads each crop as one word, so the spaces of the full-frame text are
+# usually missing ("Monday,May5,2025"): the ROI patterns anchor on day and month names
+ROI_DATE_PATTERN = re.compile(r'({}),?\s*({})\s*(\d{{1,2}}),?\s*(\d{{4}})'.format(
+    "|".join(calendar.day_name), "|".join(calendar.month_name[1:])))
+ROI_NUMBER_PATTERN = re.compile(r'\d[\d,]*(?:\.\d+)?')
+
+def parse_roi_texts(layout, texts, image_path, confidences=None):
+    """
+    Turn the recognised text of each ROI crop (one field per crop, label included) into
+    the same info dict as the full-frame path.
+    Returns None when any field is missing or implausible, so the caller can fall back.
+    """
+    confidences = confidences or {}
+    raw_text = "\n".join(texts.values())
+
+    def number(field):
+        match = ROI_NUMBER_PATTERN.search(texts[field])
+        if match is None:
+            return None
+        value = match.group(0).replace(',', '')
+        if field in FLOAT_FIELDS:
+            return float(value)
+        # A decimal in a count means the crop caught another field (e.g. the multiplier)
+        return int(value) if "." not in value else None
+
+    if layout == "Report":
+        fields = {field: number(field) for field in REPORT_FIELDS}
+        if any(value is None for value in fields.values()):
+            return None
+        if not report_values_plausible(*(fields[field] for field in REPORT_FIELDS)):
+            return None
+        date_match = re.search(r"Screenshot_(\d{4}-\d{2}-\d{2})", os.path.basename(image_path))
+        return {
+            "image_type": "Report",
+            "date": date_match.group(1) if date_match else "Unknown",
+            **fields,
+            "field_confidence": {field: confidences.get(field) for field in REPORT_FIELDS},
+            "raw_text": raw_text,
+            "status": "OK"
+        }
+
+    date_match = ROI_DATE_PATTERN.search(texts["date"])
+    session_match = SESSION_NUMBER_PATTERN.search(texts["session_number"])
+    drowsy_power = number("drowsy_power")
+    snorlax_strength = number("snorlax_strength")
+    sleep_score = number("sleep_score")
+    if not (date_match and drowsy_power and snorlax_strength and sleep_score):
+        return None
+    if not session_values_plausible(drowsy_power, snorlax_strength, sleep_score):
+        return None
+    if not session_values_consistent(drowsy_power, snorlax_strength, sleep_score):
+        return None
+    weekday, month, day, year = date_match.groups()
+    return {
+        "image_type": "Session",
+        "date": f"{weekday}, {month} {day}, {year}",
+        "session_number": int(session_match.group(1)) if session_match else None,
+        "drowsy_power": drowsy_power,
+        "snorlax_strength": snorlax_strength,
+        "sleep_score": sleep_score,
+        "field_confidence": {field: confidences.get(field) for field in SESSION_FIELDS},
+        "raw_text": raw_text,
+        "status": "OK",
+    }
+
+def extract_info_roi(image, layout, session=None):
+    """
+    Read only the field crops of a known layout. Their positions are known, so each crop
+    is cut down to its text line and goes straight to the recogniser (one call for all
+    crops): no detection pass at all.
+    image is a path or an already decoded ImageHandle.
+    Returns None if the crops do not validate and full-frame OCR is needed.
+    """
+    if session is None:
+        session = get_session()
+    image_path = path_of(image)
+    with ocr_profiler.image_scope(image_path):
+        with open_image(image) as image:
+            with ocr_profiler.span("roi_crop"):
+                lines = {field: text_line(crop) for field, crop in image.crop_rois(layout).items()}
+            if any(line.size == 0 for line in lines.values()):
+                return None
+            recognised = session.recognise(list(lines.values()))
+        with ocr_profiler.span("parse"):
+            texts = {field: text for field, (text, _) in zip(lines, recognised)}
+            confidences = {field: float(confidence) for field, (_, confidence) in zip(lines, recognised)}
+            return parse_roi_texts(layout, texts, image_path, confidences)
+
+# ---------------------------
+# Two-tier cascade: a fast model for every image, the accurate one only where needed
+# ---------------------------
+ACCURATE_DETECTION_SIZE = 1536
+
+def default_fast_engine():
+    return "onnx-int8" if engine_available("onnx-int8") else "doctr-mobile"
+
+def needs_second_pass(info, min_confidence=0.8):
+    """
+    Whether a fast-tier result has to be re-read by the accurate model: a field is
+    missing or was read with low word confidence, or the Session values are implausible
+    or inconsistent (drowsy power != strength x score). Unknown screens are accepted:
+    the screen titles are large text that the fast model reads reliably.
+    """
+    if info["image_type"] == "Report":
+        fields = REPORT_FIELDS
+    elif info["image_type"] == "Session":
+        fields = SESSION_FIELDS
+    else:
+        return False
+    if any(info.get(field) is None for field in fields):
+        return True
+    confidence = info.get("field_confidence", {})
+    if any(confidence.get(field) is not None and confidence[field] < min_confidence for field in fields):
+        return True
+    if info["image_type"] == "Session":
+        values = [info[field] for field in SESSION_FIELDS]
+        return not (info.get("date") and session_values_plausible(*values) and session_values_consistent(*values))
+    return False
+
+def refine_uncertain(results, accurate_session, cache=None, min_confidence=0.8, content_hashes=None):
+    """
+    Second tier over a stream of fast-model (image_path, info) results: the ones failing
+    needs_second_pass are re-read with accurate_session, first as field crops of the
+    detected layout (which the model sees at a higher effective resolution), then as the
+    full frame if the crops don't validate. Yields (image_path, info) in input order.
+    """
+    for img_path, info in results:
+        if needs_second_pass(info, min_confidence):
+            print(f"Uncertain fields in {img_path}, re-reading with the accurate model")
+            with ocr_profiler.image_scope(img_path), ocr_profiler.span("second_pass"):
+                retry = extract_info_roi(img_path, info["image_type"], accurate_session)
+                if retry is None:
+                    retry = extract_info_with_doctr(img_path, accurate_session, cache,
+                                                    (content_hashes or {}).get(img_path))
+            if retry["image_type"] != "Unknown":
+                info = retry
+        yield img_path, info
+
+# Per-process state for --workers mode: each worker builds its own predictor once
+_worker_session = None
+_worker_cache = None
+
+def _init_ocr_worker(num_threads, cache_path=None, profile=False, engine="doctr"):
+    global _worker_session, _worker_cache
+    if profile:
+        ocr_profiler.enable()
+    # Split the cores between workers so intra-op threads don't oversubscribe the machine
+    # (torch's thread pool, or the ONNX Runtime session options for OnnxTR)
+    _worker_session = get_session(engine=engine, num_threads=num_threads)
+    _worker_cache = OcrCache(cache_path) if cache_path else None
+
+def _ocr_worker_batch(batch):
+    image_paths, content_hashes = batch
+    results = list(extract_info_batch(image_paths, _worker_session, len(image_paths), _worker_cache,
+                                      content_hashes=content_hashes))
+    # Spans recorded in the worker travel back with the results
+    return results, ocr_profiler.drain_events()
+
+def extract_info_parallel(image_paths, workers, batch_size=1, cache_path=None, engine="doctr", content_hashes=None):
+    """
+    Run OCR over image_paths with a pool of worker processes, each owning one predictor.
+    Yields (image_path, info) in input order, regardless of which worker finishes first.
+    Each batch is sent with the content hashes already known for its images.
+    """
+    from concurrent.futures import ProcessPoolExecutor
+    batch_size = max(1, batch_size)
+    batches = [image_paths[i:i + batch_size] for i in range(0, len(image_paths), batch_size)]
+    batches = [(batch, {img_path: (content_hashes or {}).get(img_path) for img_path in batch}) for batch in batches]
+    threads_per_worker = max(1, (os.cpu_count() or 1) // workers)
+    with ProcessPoolExecutor(max_workers=workers,
+                             initializer=_init_ocr_worker,
+                             initargs=(threads_per_worker, cache_path, ocr_profiler.is_enabled(), engine)) as executor:
+        # executor.map returns results in submission order, keeping the CSV output stable
+        for batch_results, events in executor.map(_ocr_worker_batch, batches):
+            ocr_profiler.add_events(events)
+            yield from batch_results
+
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.bmp', '.tiff')
+
+def iter_image_files(folder, recursive=False):
+    """
+    Yield the image paths in folder (and its subfolders with recursive=True) while the
+    directory is being read, without building the whole listing first.
+    """
+    with os.scandir(folder) as entries:
+        for entry in entries:
+            if entry.is_file() and entry.name.lower().endswith(IMAGE_EXTENSIONS):
+                yield entry.path
+            elif recursive and entry.is_dir():
+                yield from iter_image_files(entry.path, recursive)
+
+def get_image_files(folder, recursive=False):
+    return list(iter_image_files(folder, recursive))
+
+def chunked(iterable, size):
+    # Lists of up to size items, pulled from iterable only as they are needed
+    iterator = iter(iterable)
+    while chunk := list(itertools.islice(iterator, size)):
+        yield chunk
+
+REPORT_CSV_FIELDS = ["date", "pokemon_seen", "research_exp", "exp_multiplier", "dream_shards", "report_image"]
+SESSION_CSV_FIELDS = ["date", "session_number", "drowsy_power", "snorlax_strength", "sleep_score", "session_image"]
+UNKNOWN_CSV_FIELDS = ["unknown_image"]
+
+def output_csv_paths(output_dir):
+    return (os.path.join(output_dir, "report_info.csv"),
+            os.path.join(output_dir, "session_info.csv"),
+            os.path.join(output_dir, "unknown_images.csv"))
+
+def open_result_store(output_dir):
+    """
+    Open the indexed result store of output_dir, indexing the existing CSVs the first time.
+    """
+    store_path = os.path.join(output_dir, DEFAULT_STORE_NAME)
+    is_new = not os.path.exists(store_path)
+    store = ResultStore(store_path)
+    if is_new:
+        imported = store.import_csvs(output_dir)
+        if imported:
+            print(f"Indexed {imported} previously processed images from the CSV outputs.")
+    return store
+
+def print_result(img_path, info):
+    if info["image_type"] == "Report":
+        print(f"Report data extracted from {img_path}: {info}")
+    elif info["image_type"] == "Session":
+        print(f"Session data extracted from {img_path}: {info}")
+    elif info["image_type"] == "Unknown":
+        print(f"Skipping {img_path}: Unknown Image")
+    else:
+        print(f"Warning! Image with invalid image_type ({info['image_type']}) Status={info['status']}")
+
+def _append_csv(csv_file, fieldnames, rows):
+    file_exists = os.path.exists(csv_file)
+    with open(csv_file, "a", newline='', encoding="utf-8") as csvfile:
+        writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
+        if not file_exists:
+            writer.writeheader()
+        for row in rows:
+            filtered_row = {key: row.get(key) for key in fieldnames}
+            writer.writerow(filtered_row)
+
+def store_results(store, results):
+    """
+    Add (image_name, info, content_hash) results to the store and commit them.
+    Images the store already knows are skipped.
+
+    Returns:
+        tuple of list: The newly stored report rows, session rows and unknown image names.
+    """
+    report_results, session_results, unknown_images = [], [], []
+    for name, info, content_hash in results:
+        if store.is_processed(name) or info["image_type"] not in ("Report", "Session", "Unknown"):
+            continue
+        store.add(name, info, content_hash, commit=False)
+        if info["image_type"] == "Report":
+            report_results.append({"report_image": name, **info})
+        elif info["image_type"] == "Session":
+            session_results.append({"session_image": name, **info})
+        else:
+            unknown_images.append(name)
+    store.commit()
+    return report_results, session_results, unknown_images
+
+def write_results(output_dir, store, results):
+    """
+    Add (image_name, info, content_hash) results to the store and append them to the CSVs.
+    Images the store already knows are skipped.
+
+    The store is committed first: it is what decides whether an image was processed, so
+    a crash before the CSV append can only leave rows missing from the CSVs (the next
+    journal compaction or --export-csv writes them), never appended twice.
+    """
+    report_results, session_results, unknown_images = store_results(store, results)
+
+    report_csv, session_csv, unknown_csv = output_csv_paths(output_dir)
+    # Save report results
+    _append_csv(report_csv, REPORT_CSV_FIELDS, report_results)
+    # Save session results
+    _append_csv(session_csv, SESSION_CSV_FIELDS, session_results)
+    # Save unknown images to a CSV for skipping in future runs
+    if unknown_images:
+        _append_csv(unknown_csv, UNKNOWN_CSV_FIELDS, [{"unknown_image": img} for img in unknown_images])
+
+def compact_journal(output_dir, store):
+    """
+    Move every journaled result into the store, rewrite the CSV outputs from the store,
+    then delete the journal. Records whose image is already stored (crash between commit
+    and delete) are skipped; as the CSVs are exported rather than appended to, a crash at
+    any point leaves no duplicate CSV rows.
+    """
+    journal_path = os.path.join(output_dir, DEFAULT_JOURNAL_NAME)
+    records = read_journal(journal_path)
+    if records:
+        store_results(store, [
+            (record.pop("image"), record, record.pop("content_hash", None)) for record in records
+        ])
+        store.export_csvs(output_dir)
+    if os.path.exists(journal_path):
+        os.remove(journal_path)
+    return len(records)
+
+def stored_result_info(row):
+    # Rebuild an info dict from a store row (used when a renamed copy or near duplicate is found)
+    info = {key: row[key] for key in VALUE_COLUMNS if row[key] is not None}
+    original = row.get("duplicate_of") or row["image"]
+    return {"image_type": row["image_type"], **info, "duplicate_of": original, "status": "OK"}
+
+def stored_near_duplicate(store, near_duplicates, image):
+    """
+    Stored result of an earlier screenshot image (path or ImageHandle) nearly duplicates, or None.
+    """
+    with ocr_profiler.image_scope(path_of(image)), ocr_profiler.span("near_duplicate"):
+        original = near_duplicates.match_or_add(image)
+    stored = store.get(os.path.basename(original)) if original is not None else None
+    return stored_result_info(stored) if stored is not None else None
+
+# Pre-classifier labels whose screenshots are recorded as Unknown without OCR
+SKIPPED_LABELS = ("Unknown", "Community Research")
+
+def screen_images(image_paths, on_result, on_duplicate, classifier=None, image_hashes=None,
+                  near_duplicates=None, roi_session=None, cache=None, content_hashes=None, prefetch_depth=2):
+    """
+    The cheap checks in front of full-frame OCR, with every screenshot decoded once.
+
+    Each image is opened as a single ImageHandle (decoded up to prefetch_depth images
+    ahead by background threads) that the pre-classifier, the near-duplicate index and the
+    ROI crops all read. Images one of them settles are reported to on_result(img_path, info)
+    or on_duplicate(img_path, original_path) and closed; the others are yielded, still
+    open, for full-frame OCR (extract_info_batch closes them). With none of the checks
+    enabled, the paths are yielded without decoding anything.
+
+    Args:
+        image_hashes (dict): Receives img_path -> dhash of every image the classifier
+            did not skip, so confirmed types can be learned as templates.
+        cache (OcrCache): With roi_session, images with a cached full-frame result skip
+            the ROI path (content_hashes gives their content hash).
+    """
+    if classifier is None and near_duplicates is None and roi_session is None:
+        yield from image_paths
+        return
+    for img_path, image in prefetch(image_paths, ImageHandle, workers=2, depth=prefetch_depth):
+        label = None
+        if classifier is not None:
+            with ocr_profiler.image_scope(img_path), ocr_profiler.span("preclassify"):
+                image_hash = dhash(image)
+                label = classifier.classify_hash(image_hash)
+            if label in SKIPPED_LABELS:
+                print(f"Skipping {img_path}: looks like {label} (pre-classifier)")
+                image.close()
+                on_result(img_path, {"image_type": "Unknown", "status": "Error"})
+                continue
+            if label == FAR_FROM_APP_SCREENS:
+                # Not recorded, so a later run (more templates, --no-preclassify) still reads it
+                print(f"Skipping {img_path} for this run: unlike every known app screen (pre-classifier)")
+                image.close()
+                continue
+            image_hashes[img_path] = image_hash
+        if near_duplicates is not None:
+            with ocr_profiler.image_scope(img_path), ocr_profiler.span("near_duplicate"):
+                original = near_duplicates.match_or_add(image)
+            if original is not None:
+                print(f"{img_path} is a near duplicate of {original}, reusing its result")
+                image.close()
+                on_duplicate(img_path, original)
+                continue
+        # A cached full-frame result is cheaper than any new OCR
+        if roi_session is not None and label in ROI_LAYOUTS and not (
+                cache is not None and cache.get(content_hashes[img_path], roi_session.engine,
+                                                roi_session.model_version)):
+            info = extract_info_roi(image, label, roi_session)
+            if info is not None:
+                image.close()
+                on_result(img_path, info)
+                continue
+        yield image
+
+def reparse_results(output_dir, store, cache):
+    """
+    Re-run only the parsing layer (classify_extracted_text and the field extractors) over
+    every stored result that was parsed from a full-frame page, reading back exactly that
+    page (its ocr_source) from the cache, without loading a model; then rewrite the CSVs
+    from the store. Results that reuse another image's result follow their original; the
+    rest keep their stored values: those imported from old CSVs, read from ROI crops
+    (e.g. a --cascade second pass, whose fast-tier page was rejected), skipped by the
+    pre-classifier, or stored before sources were recorded.
+
+    Returns:
+        tuple: (reparsed, changed, kept) image counts.
+    """
+    reparsed = changed = 0
+    rows = store.rows()
+    new_info = {}
+    for row in rows:
+        if row["duplicate_of"] or not row["content_hash"] or not row["ocr_source"]:
+            continue
+        engine, model_version = row["ocr_source"].split("/", 1)
+        page = cache.get_page(row["content_hash"], engine, model_version)
+        if page is None:
+            continue
+        with ocr_profiler.image_scope(row["image"]), ocr_profiler.span("parse"):
+            info = classify_extracted_text(render_page_export(page), row["image"], page)
+        info.pop("raw_text", None)
+        new_info[row["image"]] = {**info, "ocr_source": row["ocr_source"]}
+    for row in rows:
+        info = new_info.get(row["duplicate_of"] or row["image"])
+        if info is None:
+            continue
+        reparsed += 1
+        # Only rewrite rows whose values moved, so the CSV order of the rest is unchanged
+        if all(info.get(key) == row[key] for key in ("image_type", *VALUE_COLUMNS)):
+            continue
+        if row["duplicate_of"]:
+            info = {**info, "duplicate_of": row["duplicate_of"]}
+        store.add(row["image"], info, row["content_hash"], commit=False)
+        changed += 1
+        print(f"{row['image']}: updated to {info}")
+    store.commit()
+    store.export_csvs(output_dir)
+    return reparsed, changed, len(rows) - reparsed
+
+def watch_folder(folder, output_dir, store, session, cache=None, classifier=None,
+                 poll_interval=2.0, queue_size=16, near_duplicates=None):
+    """
+    Keep the model loaded and process new screenshots as they land in folder.
+
+    A file is only queued once its size and mtime are unchanged between two polls,
+    so screenshots that are still being synced are left for a later poll. OCR runs in
+    one background thread fed by a bounded queue; each result is written to the store
+    and CSVs as soon as it is ready. Runs until interrupted (Ctrl-C).
+    With a NearDuplicateIndex, a second capture of an already processed screen reuses
+    that screen's stored result.
+    """
+    seen = set()
+    last_signature = {}
+    work_queue = queue.Queue(maxsize=queue_size)
+    store_lock = threading.Lock()
+
+    def ocr_worker():
+        while True:
+            img_path = work_queue.get()
+            try:
+                content_hash = file_sha256(img_path)
+                with store_lock:
+                    stored = store.find_by_hash(content_hash)
+                if stored is not None:
+                    info = stored_result_info(stored)
+                else:
+                    # One decode for the pre-classifier, the near-duplicate index and OCR
+                    with ImageHandle(img_path) as image:
+                        image_hash = dhash(image) if classifier is not None else None
+                        label = classifier.classify_hash(image_hash) if classifier is not None else None
+                        if label == FAR_FROM_APP_SCREENS:
+                            # Not recorded: the next start of the watcher looks at it again
+                            print(f"Skipping {img_path}: unlike every known app screen (pre-classifier)")
+                            continue
+                        duplicate = None
+                        if near_duplicates is not None and label not in SKIPPED_LABELS:
+                            with store_lock:
+                                duplicate = stored_near_duplicate(store, near_duplicates, image)
+                        if label in SKIPPED_LABELS:
+                            info = {"image_type": "Unknown", "status": "Error"}
+                        elif duplicate is not None:
+                            info = duplicate
+                        else:
+                            info = extract_info_with_doctr(image, session, cache, content_hash)
+                            if classifier is not None:
+                                classifier.learn(image_hash, template_label(info))
+                                classifier.save()
+                print_result(img_path, info)
+                with store_lock:
+                    write_results(output_dir, store, [(os.path.basename(img_path), info, content_hash)])
+            except Exception as e:
+                print(f"Failed to process {img_path}: {e}")
+            finally:
+                work_queue.task_done()
+
+    threading.Thread(target=ocr_worker, daemon=True).start()
+    print(f"Watching {folder} for new screenshots (every {poll_interval}s). Press Ctrl-C to stop.")
+    try:
+        while True:
+            for img_path in get_image_files(folder):
+                name = os.path.basename(img_path)
+                if name in seen:
+                    continue
+                with store_lock:
+                    processed = store.is_processed(name)
+                if processed:
+                    seen.add(name)
+                    continue
+                try:
+                    stat = os.stat(img_path)
+                except OSError:
+                    continue  # Removed or renamed between listing and stat
+                signature = (stat.st_size, stat.st_mtime)
+                if last_signature.get(img_path) == signature:
+                    # Blocks while the queue is full, so a burst of syncs can't pile up in memory
+                    work_queue.put(img_path)
+                    seen.add(name)
+                    del last_signature[img_path]
+                else:
+                    last_signature[img_path] = signature
+            time.sleep(poll_interval)
+    except KeyboardInterrupt:
+        print("Stopping watch, finishing queued screenshots...")
+        work_queue.join()
+
+def stream_folder(folder, output_dir, store, session, cache=None, classifier=None, batch_size=1,
+                  prefetch_depth=2, recursive=False, use_roi=False, chunk_size=200, dedupe=True,
+                  accurate_session=None, min_confidence=0.8):
+    """
+    Process a folder of any size with constant memory.
+
+    Discovery, the skip checks, OCR and output are chained generators: images are pulled
+    from the directory scan chunk_size at a time, and every chunk is written to the store
+    and CSVs (and committed) before the next one is read. raw_text is dropped as soon as a
+    result is parsed; the OCR cache on disk still holds the full output.
+    With dedupe, near-duplicate screenshots reuse the result of their original; the index
+    is rebuilt for every chunk, so duplicates split across two chunks are both OCR'd.
+    With accurate_session, session is the fast tier and uncertain results are re-read
+    by refine_uncertain.
+
+    Returns:
+        int: Number of images processed.
+    """
+    def pending_images():
+        for img_path in iter_image_files(folder, recursive):
+            if not store.is_processed(os.path.basename(img_path)):
+                yield img_path
+
+    processed = 0
+    for chunk in chunked(pending_images(), chunk_size):
+        results = {}
+        to_screen = []
+        image_hashes = {}
+        content_hashes = {}
+        duplicates = {}
+        for img_path in chunk:
+            with ocr_profiler.image_scope(img_path), ocr_profiler.span("hash"):
+                content_hashes[img_path] = file_sha256(img_path)
+            stored = store.find_by_hash(content_hashes[img_path])
+            if stored is not None:
+                results[img_path] = stored_result_info(stored)
+            else:
+                to_screen.append(img_path)
+
+        # One decode per image for the pre-classifier, near-duplicate index, ROI crops and OCR
+        screened = screen_images(
+            to_screen, results.__setitem__, duplicates.__setitem__, classifier=classifier,
+            image_hashes=image_hashes, near_duplicates=NearDuplicateIndex() if dedupe else None,
+            roi_session=session if use_roi and classifier is not None else None,
+            cache=cache, content_hashes=content_hashes, prefetch_depth=prefetch_depth)
+        ocr_results = extract_info_batch(screened, session, batch_size, cache, prefetch_depth, content_hashes)
+        if accurate_session is not None:
+            ocr_results = refine_uncertain(ocr_results, accurate_session, cache, min_confidence, content_hashes)
+        for img_path, info in ocr_results:
+            results[img_path] = info
+            if img_path in image_hashes:
+                classifier.learn(image_hashes[img_path], template_label(info))
+        for img_path, original in duplicates.items():
+            results[img_path] = {**results[original], "duplicate_of": os.path.basename(original)}
+
+        for img_path in chunk:
+            results[img_path].pop("raw_text", None)
+            print_result(img_path, results[img_path])
+        with ocr_profiler.span("write"):
+            write_results(output_dir, store, [
+                (os.path.basename(img_path), results[img_path], content_hashes[img_path]) for img_path in chunk
+            ])
+        if classifier is not None:
+            classifier.save()
+        processed += len(chunk)
+        print(f"Processed {processed} images so far.")
+    return processed
 
 def main():
     parser = argparse.ArgumentParser(description="Extract PKMN Sleep session data from screenshots using OCR.")
     parser.add_argument("folder", help="Folder containing screenshot images")
     parser.add_argument("output", help="Directory to save output")
+    parser.add_argument("--engine", choices=["auto", *ENGINE_PRESETS], default="auto",
+                        help="OCR models: doctr (full size), doctr-mobile (mobilenet), onnx-int8 (mobilenet, "
+                             "int8, ONNX Runtime). auto (default) picks the fastest one within 2%% of the best "
+                             "accuracy in benchmarks/baseline.json, or doctr if there are no results")
+    parser.add_argument("--cascade", action="store_true",
+                        help="Read every screenshot with a fast model (onnx-int8 if installed, else doctr-mobile, "
+                             "or --engine if set to one of those) and re-read only uncertain or inconsistent "
+                             "fields with full doctr at a higher detection resolution")
+    parser.add_argument("--min-confidence", type=float, default=0.8,
+                        help="With --cascade, word confidence below which a field is re-read (default: 0.8)")
+    parser.add_argument("--warm-start", action="store_true",
+                        help="Load the OCR model before processing instead of on the first image")
+    parser.add_argument("--batch-size", type=int, default=1,
+                        help="Number of screenshots sent to the OCR model per call (default: 1)")
+    parser.add_argument("--prefetch", type=int, default=2,
+                        help="Batches decoded ahead of the OCR model by background threads (0 disables, default: 2)")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Number of OCR worker processes, each with its own model (default: 1)")
+    parser.add_argument("--cache", default=None,
+                        help=f"OCR result cache file (default: <output>/{DEFAULT_CACHE_NAME})")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="Always run OCR, without reading or writing the result cache")
+    parser.add_argument("--no-preclassify", action="store_true",
+                        help="Run OCR on every image instead of skipping ones that look irrelevant")
+    parser.add_argument("--templates", default=None,
+                        help=f"Screen template file of the pre-classifier (default: <output>/{DEFAULT_TEMPLATES_NAME}); "
+                             "share it with read_community_research.py --templates to skip community research "
+                             "screens without OCR")
+    parser.add_argument("--no-dedupe", action="store_true",
+                        help="OCR every screenshot instead of reusing the result of a near-identical "
+                             "capture of the same screen taken shortly before")
+    parser.add_argument("--roi", action="store_true",
+                        help="For screens the pre-classifier recognises, OCR only the field regions "
+                             "(falls back to full-frame OCR if they don't validate)")
+    parser.add_argument("--watch", action="store_true",
+                        help="Keep running and process new screenshots as they appear in the folder")
+    parser.add_argument("--poll-interval", type=float, default=2.0,
+                        help="Seconds between folder scans in --watch mode (default: 2)")
+    parser.add_argument("--stream", action="store_true",
+                        help="Constant-memory mode for very large folders: scan, OCR and write results "
+                             "in chunks instead of listing the whole folder first")
+    parser.add_argument("--recursive", action="store_true",
+                        help="With --stream, also process images in subfolders")
+    parser.add_argument("--reparse", action="store_true",
+                        help="Re-run only the parsing over every stored result from the cached OCR output "
+                             "(no model is loaded), update the store and rewrite the CSVs, then exit")
+    parser.add_argument("--export-csv", action="store_true",
+                        help="Rewrite the CSV outputs from the result store and exit")
+    parser.add_argument("--timings", action="store_true",
+                        help="Print start-up, framework import and model setup times and the total run time")
+    parser.add_argument("--profile", action="store_true",
+                        help="Time every OCR stage; writes profile_trace.json (Chrome trace) and "
+                             "profile_images.json to the output folder and prints p50/p95 per stage")
     args = parser.parse_args()
 
-    image_files = get_image_files(args.folder)
+    if args.profile:
+        ocr_profiler.enable()
+    if args.timings:
+        atexit.register(ocr_profiler.print_timings, _START, _STARTUP_SECONDS)
+
+    engine = resolve_engine(args.engine)
+    accurate_session = None
+    if args.cascade:
+        if engine == "doctr":
+            engine = default_fast_engine()
+        accurate_session = get_session(engine="doctr", detection_size=ACCURATE_DETECTION_SIZE)
+        print(f"Cascade: {engine}, then doctr at {ACCURATE_DETECTION_SIZE}px for uncertain fields")
+    elif args.engine == "auto":
+        print(f"Using OCR engine: {engine}")
 
     # Create output directory if it doesn't exist
     output_dir = args.output
     os.makedirs(output_dir, exist_ok=True)
-    report_csv = os.path.join(output_dir, "report_info.csv")
-    session_csv = os.path.join(output_dir, "session_info.csv")
-    unknown_csv = os.path.join(output_dir, "unknown_images.csv")
-
-    # Check for already processed images in existing CSVs
-    processed_images = set()
-    for csv_file, image_key in [(report_csv, "report_image"),
-                                (session_csv, "session_image"),
-                                (unknown_csv, "unknown_image")]:
-        if os.path.exists(csv_file):
-            with open(csv_file, newline='', encoding="utf-8") as f:
-                reader = csv.DictReader(f)
-                for row in reader:
-                    if row.get(image_key):
-                        processed_images.add(row[image_key])
+
+    # Indexed store of processed images: O(1) "already processed?" checks instead of CSV re-scans
+    store = open_result_store(output_dir)
+
+    # Fold in results journaled by an interrupted run, so its images are not processed again
+    recovered = compact_journal(output_dir, store)
+    if recovered:
+        print(f"Recovered {recovered} results from an interrupted run.")
+
+    templates_path = args.templates or os.path.join(output_dir, DEFAULT_TEMPLATES_NAME)
+
+    if args.reparse:
+        cache_path = args.cache or os.path.join(output_dir, DEFAULT_CACHE_NAME)
+        with OcrCache(cache_path) as cache:
+            reparsed, changed, kept = reparse_results(output_dir, store, cache)
+        store.close()
+        print(f"Re-parsed {reparsed} results ({changed} changed); {kept} without cached OCR output were kept.")
+        return
+
+    if args.export_csv:
+        store.export_csvs(output_dir)
+        print(f"Exported {len(store)} results to the CSV files in {output_dir}")
+        return
+
+    if args.watch:
+        cache_path = None if args.no_cache else (args.cache or os.path.join(output_dir, DEFAULT_CACHE_NAME))
+        classifier = None if args.no_preclassify else ScreenClassifier(templates_path)
+        watch_folder(args.folder, output_dir, store, get_session(warm_start=True, engine=engine),
+                     cache=OcrCache(cache_path) if cache_path else None,
+                     classifier=classifier, poll_interval=args.poll_interval,
+                     near_duplicates=None if args.no_dedupe else NearDuplicateIndex())
+        return
+
+    if args.stream:
+        cache_path = None if args.no_cache else (args.cache or os.path.join(output_dir, DEFAULT_CACHE_NAME))
+        classifier = None if args.no_preclassify else ScreenClassifier(templates_path)
+        cache = OcrCache(cache_path) if cache_path else None
+        session = get_session(warm_start=args.warm_start, engine=engine)
+        processed = stream_folder(args.folder, output_dir, store, session,
+                                  cache=cache, classifier=classifier, batch_size=args.batch_size,
+                                  prefetch_depth=args.prefetch, recursive=args.recursive, use_roi=args.roi,
+                                  dedupe=not args.no_dedupe, accurate_session=accurate_session,
+                                  min_confidence=args.min_confidence)
+        store.close()
+        if args.profile:
+            ocr_profiler.write_chrome_trace(os.path.join(output_dir, "profile_trace.json"))
+            ocr_profiler.write_image_report(os.path.join(output_dir, "profile_images.json"))
+            ocr_profiler.print_summary()
+        print(f"Extraction complete. {processed} images processed, results saved to {args.output}")
+        return
+
+    image_files = get_image_files(args.folder)
 
     # Filter out images that have already been processed
     total_images = len(image_files)
-    image_files = [img for img in image_files if os.path.basename(img) not in processed_images]
+    image_files = [img for img in image_files if not store.is_processed(os.path.basename(img))]
     already_processed = total_images - len(image_files)
     to_process = len(image_files)
     print(f"Found {total_images} images. {already_processed} already processed, {to_process} to process.")
     
-    report_results = []
-    session_results = []
-    # Collect unknown image filenames for later saving
-    unknown_images = []
+    # Every result is journaled as soon as it exists and moved to the store/CSVs at the end
+    journal = ResultJournal(os.path.join(output_dir, DEFAULT_JOURNAL_NAME))
+    classifier = None
+    content_hashes = {}
+    image_hashes = {}
+    duplicates = {}
+    # Results handled so far, for near duplicates that turn up after their original
+    handled = {}
+
+    def handle_result(img_path, info):
+        if classifier is not None and img_path in image_hashes:
+            # Confirmed types become templates for future runs
+            classifier.learn(image_hashes.pop(img_path), template_label(info))
+        print_result(img_path, info)
+        with ocr_profiler.image_scope(img_path), ocr_profiler.span("write"):
+            journal.append(img_path, {**info, "content_hash": content_hashes.get(img_path)})
+        handled[img_path] = {key: value for key, value in info.items() if key != "raw_text"}
+        for duplicate in duplicates.pop(img_path, ()):
+            handle_result(duplicate, {**info, "duplicate_of": os.path.basename(img_path)})
 
+    # Renamed or re-exported copies of processed screenshots reuse the stored result
+    pending = []
     for img_path in image_files:
-        info = extract_info_with_doctr(img_path)
-        
-        if info["image_type"] == "Report":
-            print(f"Report data extracted from {img_path}: {info}")
-            report_results.append({
-                "report_image": os.path.basename(img_path),
-                **info,            
-            })
-        elif info["image_type"] == "Session":
-            print(f"Session data extracted from {img_path}: {info}")
-            session_results.append({
-                "session_image": os.path.basename(img_path),
-                **info,            
-            })
-        elif info["image_type"] == "Unknown":
-            print(f"Skipping {img_path}: Unknown Image")
-            unknown_images.append(os.path.basename(img_path))
-            continue
+        with ocr_profiler.image_scope(img_path), ocr_profiler.span("hash"):
+            content_hashes[img_path] = file_sha256(img_path)
+        stored = store.find_by_hash(content_hashes[img_path])
+        if stored is None:
+            pending.append(img_path)
         else:
-            print(f"Warning! Image with invalid image_type ({info['image_type']}) Status={info['status']}")
+            print(f"{img_path} has the same content as {stored['image']}, reusing its result")
+            handle_result(img_path, stored_result_info(stored))
+    image_files = pending
 
-    # Save report results
-    report_exists = os.path.exists(report_csv)
-    with open(report_csv, "a", newline='', encoding="utf-8") as csvfile:
-        fieldnames = ["date", "pokemon_seen", "research_exp", "exp_multiplier", "dream_shards", "report_image"]
-        writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-        if not report_exists:
-            writer.writeheader()
-        for row in report_results:
-            filtered_row = {key: row.get(key) for key in fieldnames}
-            writer.writerow(filtered_row)
+    # Raw OCR output is cached by image content, so renamed screenshots are not OCR'd again
+    cache_path = None if args.no_cache else (args.cache or os.path.join(output_dir, DEFAULT_CACHE_NAME))
+    cache = OcrCache(cache_path) if cache_path else None
 
-    # Save session results
-    session_exists = os.path.exists(report_csv)
-    with open(session_csv, "a", newline='', encoding="utf-8") as csvfile:
-        fieldnames = ["date", "session_number", "drowsy_power", "snorlax_strength", "sleep_score", "session_image"]
-        writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-        if not session_exists:
-            writer.writeheader()
-        for row in session_results:
-            filtered_row = {key: row.get(key) for key in fieldnames}
-            writer.writerow(filtered_row)
+    # The pre-classifier skips images whose thumbnail confidently matches known irrelevant
+    # screens, near-identical captures of one screen are OCR'd once, and with --roi only the
+    # field regions of recognised screens go through the model. All three read one decode
+    # of each image, which full-frame OCR then reuses.
+    if not args.no_preclassify:
+        classifier = ScreenClassifier(templates_path)
 
-    # Save unknown images to a CSV for skipping in future runs
-    if unknown_images:
-        unknown_exists = os.path.exists(unknown_csv)
-        with open(unknown_csv, "a", newline='', encoding="utf-8") as csvfile:
-            fieldnames = ["unknown_image"]
-            writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-            if not unknown_exists:
-                writer.writeheader()
-            for img in unknown_images:
-                writer.writerow({"unknown_image": img})
+    def handle_duplicate(img_path, original):
+        if original in handled:
+            handle_result(img_path, {**handled[original], "duplicate_of": os.path.basename(original)})
+        else:
+            duplicates.setdefault(original, []).append(img_path)
+
+    screened = screen_images(
+        image_files, handle_result, handle_duplicate, classifier=classifier, image_hashes=image_hashes,
+        near_duplicates=None if args.no_dedupe else NearDuplicateIndex(),
+        roi_session=get_session(engine=engine) if args.roi and classifier is not None else None,
+        cache=cache, content_hashes=content_hashes, prefetch_depth=args.prefetch)
+
+    if args.workers > 1:
+        # Worker processes decode their own copy; the handles were only needed for the checks
+        image_files = []
+        for image in screened:
+            if not isinstance(image, str):
+                image.close()
+            image_files.append(path_of(image))
+        screened = image_files
+    if args.workers > 1 and len(image_files) > 1:
+        results = extract_info_parallel(image_files, min(args.workers, len(image_files)), args.batch_size,
+                                        cache_path, engine, content_hashes)
+    else:
+        # One OCR session for the whole run (model is only built if there is work to do)
+        session = get_session(warm_start=args.warm_start and bool(image_files), engine=engine)
+        results = extract_info_batch(screened, session, args.batch_size, cache, args.prefetch, content_hashes)
+    if accurate_session is not None:
+        results = refine_uncertain(results, accurate_session, cache, args.min_confidence, content_hashes)
 
+    for img_path, info in results:
+        handle_result(img_path, info)
+
+    if classifier is not None:
+        classifier.save()
+
+    journal.close()
+    compact_journal(output_dir, store)
+    store.close()
+
+    if args.profile:
+        ocr_profiler.write_chrome_trace(os.path.join(output_dir, "profile_trace.json"))
+        ocr_profiler.write_image_report(os.path.join(output_dir, "profile_images.json"))
+        ocr_profiler.print_summary()
 
     print(f"Extraction complete. Results saved to {args.output}")
 
+_STARTUP_SECONDS = time.perf_counter() - _START
+
 if __name__ == "__main__":
     main()
@@ -0,0 +1,65 @@
+import json
+import os
+
+###########################################
+# Append-only journal of extraction results
+#
+# Each result is written as one JSON line the moment it is produced, so a crash or Ctrl-C
+# loses at most the image being processed. The journal is folded into the CSV outputs at
+# the end of a run, or at the start of the next run if the previous one was interrupted.
+
+DEFAULT_JOURNAL_NAME = "results.journal.jsonl"
+
+class ResultJournal:
+    """
+    Args:
+        path (str): Journal file (appended to if it already exists).
+        flush_every (int): Flush and fsync after this many records.
+    """
+
+    def __init__(self, path, flush_every=1):
+        self.path = path
+        self.flush_every = max(1, flush_every)
+        self._pending = 0
+        self._file = open(path, "a", encoding="utf-8")
+
+    def append(self, image_path, info):
+        # raw_text is not part of the CSV outputs and would dominate the journal size
+        record = {key: value for key, value in info.items() if key != "raw_text"}
+        record["image"] = os.path.basename(image_path)
+        self._file.write(json.dumps(record, ensure_ascii=False) + "\n")
+        self._pending += 1
+        if self._pending >= self.flush_every:
+            self.flush()
+
+    def flush(self):
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._pending = 0
+
+    def close(self):
+        if not self._file.closed:
+            self.flush()
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+def read_journal(path):
+    """
+    Return the journal records in write order. A partially written last line
+    (interrupted mid-write) is ignored.
+    """
+    records = []
+    if not os.path.exists(path):
+        return records
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                records.append(json.loads(line))
+            except json.JSONDecodeError:
+                print(f"Warning! Ignoring truncated journal line in {path}")
+    return records
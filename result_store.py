@@ -0,0 +1,179 @@
+import csv
+import os
+import sqlite3
+from datetime import datetime
+
+###########################################
+# Indexed result store (SQLite) behind the report/session/unknown CSV outputs
+#
+# One row per image, keyed by image name, with indexes on content hash and on
+# (image_type, date). "Already processed?" is a primary-key lookup instead of a re-scan of
+# every CSV, and plots can ask for a date range directly. The CSVs can always be exported
+# again from here in their original schema.
+
+DEFAULT_STORE_NAME = "results.sqlite"
+
+REPORT_COLUMNS = ["date", "pokemon_seen", "research_exp", "exp_multiplier", "dream_shards"]
+SESSION_COLUMNS = ["date", "session_number", "drowsy_power", "snorlax_strength", "sleep_score"]
+CSV_LAYOUTS = {
+    # image_type: (csv name, image column, value columns)
+    "Report": ("report_info.csv", "report_image", REPORT_COLUMNS),
+    "Session": ("session_info.csv", "session_image", SESSION_COLUMNS),
+    "Unknown": ("unknown_images.csv", "unknown_image", []),
+}
+VALUE_COLUMNS = ["date", "pokemon_seen", "research_exp", "exp_multiplier", "dream_shards",
+                 "session_number", "drowsy_power", "snorlax_strength", "sleep_score"]
+
+def normalise_date(date):
+    """
+    Convert a Report date (2025-05-03) or Session date (Monday, May 5, 2025) to ISO format.
+    Returns None if the date can't be parsed.
+    """
+    if not date:
+        return None
+    for fmt in ("%Y-%m-%d", "%A, %B %d, %Y", "%B %d, %Y"):
+        try:
+            return datetime.strptime(date.strip(), fmt).date().isoformat()
+        except ValueError:
+            continue
+    return None
+
+class ResultStore:
+    """
+    Args:
+        path (str): SQLite file to open or create.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS results (
+                image TEXT PRIMARY KEY,
+                image_type TEXT NOT NULL,
+                content_hash TEXT,
+                duplicate_of TEXT,
+                ocr_source TEXT,
+                date_iso TEXT,
+                date TEXT,
+                pokemon_seen INTEGER,
+                research_exp INTEGER,
+                exp_multiplier REAL,
+                dream_shards INTEGER,
+                session_number INTEGER,
+                drowsy_power INTEGER,
+                snorlax_strength INTEGER,
+                sleep_score INTEGER
+            );
+            CREATE INDEX IF NOT EXISTS idx_results_hash ON results(content_hash);
+            CREATE INDEX IF NOT EXISTS idx_results_type_date ON results(image_type, date_iso);
+            """
+        )
+        columns = {row["name"] for row in self.conn.execute("PRAGMA table_info(results)")}
+        if "duplicate_of" not in columns:
+            # Stores created before duplicate links were recorded
+            self.conn.execute("ALTER TABLE results ADD COLUMN duplicate_of TEXT")
+        if "ocr_source" not in columns:
+            # Stores created before the full-frame page behind each result was recorded
+            self.conn.execute("ALTER TABLE results ADD COLUMN ocr_source TEXT")
+        self.conn.commit()
+
+    def __len__(self):
+        return self.conn.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+
+    def is_processed(self, image):
+        return self.conn.execute("SELECT 1 FROM results WHERE image = ?", (image,)).fetchone() is not None
+
+    def find_by_hash(self, content_hash):
+        """
+        Return the stored result of an image with the same content (e.g. a renamed copy), or None.
+        """
+        row = self.conn.execute("SELECT * FROM results WHERE content_hash = ? LIMIT 1", (content_hash,)).fetchone()
+        return dict(row) if row else None
+
+    def get(self, image):
+        row = self.conn.execute("SELECT * FROM results WHERE image = ?", (image,)).fetchone()
+        return dict(row) if row else None
+
+    def add(self, image, info, content_hash=None, commit=True):
+        """
+        Insert or replace the result of image. info["duplicate_of"], if present, records
+        the image whose result this one reuses; info["ocr_source"] the cached full-frame
+        page ("<engine>/<model version>") the values were parsed from.
+        """
+        values = [info.get(column) for column in VALUE_COLUMNS]
+        self.conn.execute(
+            f"INSERT OR REPLACE INTO results (image, image_type, content_hash, duplicate_of, ocr_source, date_iso, "
+            f"{', '.join(VALUE_COLUMNS)}) VALUES (?, ?, ?, ?, ?, ?, {', '.join('?' * len(VALUE_COLUMNS))})",
+            [image, info["image_type"], content_hash, info.get("duplicate_of"), info.get("ocr_source"),
+             normalise_date(info.get("date")), *values],
+        )
+        if commit:
+            self.conn.commit()
+
+    def commit(self):
+        self.conn.commit()
+
+    def rows(self):
+        return [dict(row) for row in self.conn.execute("SELECT * FROM results ORDER BY rowid")]
+
+    def query(self, image_type, start=None, end=None):
+        """
+        Rows of one image type, optionally limited to an inclusive ISO date range, in date order.
+        """
+        sql = "SELECT * FROM results WHERE image_type = ?"
+        params = [image_type]
+        if start is not None:
+            sql += " AND date_iso >= ?"
+            params.append(start)
+        if end is not None:
+            sql += " AND date_iso <= ?"
+            params.append(end)
+        return [dict(row) for row in self.conn.execute(sql + " ORDER BY date_iso, image", params)]
+
+    def import_csvs(self, output_dir):
+        """
+        Load results from existing report/session/unknown CSVs (one-off migration).
+        """
+        imported = 0
+        for image_type, (csv_name, image_key, columns) in CSV_LAYOUTS.items():
+            csv_file = os.path.join(output_dir, csv_name)
+            if not os.path.exists(csv_file):
+                continue
+            with open(csv_file, newline='', encoding="utf-8") as f:
+                for row in csv.DictReader(f):
+                    if not row.get(image_key):
+                        continue
+                    info = {"image_type": image_type}
+                    info.update({column: row.get(column) or None for column in columns})
+                    self.add(row[image_key], info, commit=False)
+                    imported += 1
+        self.conn.commit()
+        return imported
+
+    def export_csvs(self, output_dir):
+        """
+        Rewrite report_info.csv, session_info.csv and unknown_images.csv from the store.
+        Each file is written next to the old one and swapped in, so an interrupted export
+        leaves the previous CSV intact.
+        """
+        for image_type, (csv_name, image_key, columns) in CSV_LAYOUTS.items():
+            csv_file = os.path.join(output_dir, csv_name)
+            with open(csv_file + ".tmp", "w", newline='', encoding="utf-8") as f:
+                writer = csv.DictWriter(f, fieldnames=columns + [image_key])
+                writer.writeheader()
+                for row in self.conn.execute(
+                        "SELECT * FROM results WHERE image_type = ? ORDER BY rowid", (image_type,)):
+                    writer.writerow({**{column: row[column] for column in columns}, image_key: row["image"]})
+            os.replace(csv_file + ".tmp", csv_file)
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
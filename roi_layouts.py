@@ -0,0 +1,68 @@
+import numpy as np
+
+###########################################
+# Region-of-interest templates for the fixed Report and Session screen layouts
+#
+# Boxes are (x0, y0, x1, y1) fractions of the frame, measured on 1080x2400 screenshots and
+# padded so each crop also holds the field's label. Fractions scale to any resolution with
+# the same layout; a crop that does not validate falls back to full-frame OCR anyway.
+
+ROI_LAYOUTS = {
+    "Report": {
+        "pokemon_seen": (0.04, 0.28, 0.96, 0.36),
+        "research_exp": (0.04, 0.36, 0.96, 0.46),
+        "exp_multiplier": (0.04, 0.42, 0.96, 0.50),
+        "dream_shards": (0.04, 0.48, 0.96, 0.58),
+    },
+    "Session": {
+        "date": (0.04, 0.03, 0.96, 0.09),
+        "session_number": (0.04, 0.07, 0.96, 0.13),
+        "snorlax_strength": (0.04, 0.13, 0.60, 0.21),
+        "sleep_score": (0.50, 0.13, 0.96, 0.21),
+        "drowsy_power": (0.04, 0.20, 0.96, 0.29),
+    },
+}
+
+def scale_box(box, width, height):
+    x0, y0, x1, y1 = box
+    return int(x0 * width), int(y0 * height), int(x1 * width), int(y1 * height)
+
+def crop_rois(image, layout):
+    """
+    Cut every field of a layout out of an RGB image array.
+
+    Args:
+        image (np.ndarray): H x W x 3 image.
+        layout (str): Key of ROI_LAYOUTS.
+
+    Returns:
+        dict: field name -> crop (a view into image, no pixel copy).
+    """
+    height, width = image.shape[:2]
+    crops = {}
+    for field, box in ROI_LAYOUTS[layout].items():
+        x0, y0, x1, y1 = scale_box(box, width, height)
+        crops[field] = image[y0:y1, x0:x1]
+    return crops
+
+def text_line(crop, contrast=40, pad=4):
+    """
+    Tighten a field crop to the text it holds. The recogniser scales every crop to one
+    fixed line height, so blank padding around the text only makes the glyphs smaller.
+    The background is the median of the crop's border pixels (green channel).
+
+    Returns:
+        np.ndarray: View of crop around its text, empty when the crop holds none.
+    """
+    # One channel is enough to find dark-on-light (or light-on-dark) text
+    channel = crop[..., 1] if crop.ndim == 3 else crop
+    border = np.concatenate([channel[0], channel[-1], channel[:, 0], channel[:, -1]])
+    background = int(np.median(border))
+    ink = (channel < background - contrast) | (channel > background + contrast)
+    rows = np.flatnonzero(ink.any(axis=1))
+    cols = np.flatnonzero(ink.any(axis=0))
+    if rows.size == 0:
+        return crop[:0, :0]
+    height, width = ink.shape
+    return crop[max(rows[0] - pad, 0):min(rows[-1] + pad + 1, height),
+                max(cols[0] - pad, 0):min(cols[-1] + pad + 1, width)]
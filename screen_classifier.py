@@ -0,0 +1,112 @@
+import json
+import os
+from image_hash import HASH_METHOD, dhash, hamming
+
+###########################################
+# Cheap screenshot-type pre-classifier (Report / Session / Community Research / Unknown)
+#
+# Every screen of the same kind shares its layout, so the perceptual hash of a tiny
+# thumbnail is close to the hashes of earlier screenshots of that kind. Templates are
+# learned from images whose type was confirmed by OCR (Report/Session by the doctr
+# pipeline, Community Research by the Tesseract and EasyOCR front-ends), and only
+# confident matches are trusted. Camera-roll junk is too varied to be matched against
+# earlier junk, so once several of the app's own screens are known, an image far from
+# every one of them is reported as FAR_FROM_APP_SCREENS. That is a weaker verdict than a
+# template match (an app screen with an unseen theme can land there too), so callers
+# skip such images for the run without recording them. Anything in between still goes
+# through full OCR.
+
+DEFAULT_TEMPLATES_NAME = "screen_templates.json"
+SCREEN_TYPES = ("Report", "Session", "Community Research", "Unknown")
+# Screens of the app; the far-from-everything rule needs templates of all of PARSED_TYPES
+APP_SCREEN_TYPES = ("Report", "Session", "Community Research")
+PARSED_TYPES = ("Report", "Session")
+# Not a screen type: the label of images far from every app screen template
+FAR_FROM_APP_SCREENS = "Far from app screens"
+
+class ScreenClassifier:
+    """
+    Nearest-template classifier over perceptual hashes.
+
+    Args:
+        templates_path (str): JSON file holding the learned templates (created on save).
+        max_distance (int): Largest Hamming distance accepted as a match.
+        margin (int): A match is only trusted if no template of another type is
+            within this many extra bits.
+        max_templates (int): Templates kept per screen type.
+        unknown_distance (int): Once Report and Session have min_templates templates
+            each, an image further than this from every app screen template is reported
+            as FAR_FROM_APP_SCREENS. On synthetic renders, photos were 24-39 bits (of 64)
+            from every template and app screens 12-24 bits from each other.
+        min_templates (int): Templates of each of Report and Session needed before the
+            far-from-everything rule applies (near-identical captures count once), so one
+            screen's background does not stand for every theme of the app.
+    """
+
+    def __init__(self, templates_path, max_distance=5, margin=3, max_templates=200,
+                 unknown_distance=20, min_templates=5):
+        self.templates_path = templates_path
+        self.max_distance = max_distance
+        self.margin = margin
+        self.max_templates = max_templates
+        self.unknown_distance = unknown_distance
+        self.min_templates = min_templates
+        self.templates = {label: [] for label in SCREEN_TYPES}
+        if os.path.exists(templates_path):
+            with open(templates_path, encoding="utf-8") as f:
+                saved = json.load(f)
+            if saved.get("hash_method") == HASH_METHOD:
+                for label, hashes in saved["templates"].items():
+                    self.templates[label] = [int(h, 16) for h in hashes]
+            else:
+                # Templates hashed another way would match at random; they are learned again
+                print(f"Ignoring screen templates made with another hash method: {templates_path}")
+        self._dirty = False
+
+    def classify_hash(self, image_hash):
+        """
+        Returns:
+            str or None: The screen type, FAR_FROM_APP_SCREENS, or None when the match
+            is not confident.
+        """
+        best = {}
+        for label, hashes in self.templates.items():
+            if hashes:
+                best[label] = min(hamming(image_hash, h) for h in hashes)
+        if not best:
+            return None
+        label = min(best, key=best.get)
+        distance = best[label]
+        if distance <= self.max_distance and not any(
+                d <= distance + self.margin for other, d in best.items() if other != label):
+            return label
+        if self.knows_app_screens() and all(
+                best.get(screen, self.unknown_distance + 1) > self.unknown_distance for screen in APP_SCREEN_TYPES):
+            return FAR_FROM_APP_SCREENS
+        return None
+
+    def knows_app_screens(self):
+        return all(len(self.templates[screen]) >= self.min_templates for screen in PARSED_TYPES)
+
+    def classify(self, image):
+        return self.classify_hash(dhash(image))
+
+    def learn(self, image_hash, label):
+        hashes = self.templates.setdefault(label, [])
+        # Near-identical templates add nothing but lookup cost
+        if any(hamming(image_hash, h) <= 1 for h in hashes):
+            return
+        hashes.append(image_hash)
+        if len(hashes) > self.max_templates:
+            hashes.pop(0)
+        self._dirty = True
+
+    def save(self):
+        if not self._dirty:
+            return
+        with open(self.templates_path, "w", encoding="utf-8") as f:
+            json.dump({
+                "hash_method": HASH_METHOD,
+                "templates": {label: [f"{h:016x}" for h in hashes] for label, hashes in self.templates.items()},
+            }, f, indent=1)
+        self._dirty = False
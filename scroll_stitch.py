@@ -0,0 +1,102 @@
+import ocr_profiler
+
+###########################################
+# Stitching of scrolled captures of one long list (community research)
+#
+# Consecutive screenshots of a scrolled list overlap: the top of the list area in capture
+# N+1 shows what was further down in capture N. Matching that top strip against the
+# previous capture (normalised squared difference on a downscaled grayscale copy) gives
+# candidate scroll distances. List screens are mostly flat background and rows of the same
+# shape, so the strip also fits places it does not come from; a candidate is only accepted
+# when the whole overlap it implies agrees row by row, and exactly one candidate does.
+# Anything else counts as no overlap, and the caller reads the whole capture.
+# Static chrome (status bar, title, tab bar) is left out of the match by LIST_BAND.
+
+# (top, bottom) of the scrolling list area, as fractions of the frame height
+LIST_BAND = (0.15, 0.90)
+
+def band_rows(height, band=LIST_BAND):
+    return int(band[0] * height), int(band[1] * height)
+
+def overlap_agrees(previous_band, current_band, offset, pixel_threshold=48, max_changed_rows=0.01):
+    """
+    Whether current_band is previous_band scrolled up by offset rows: the rows they share
+    may only differ by compression noise. Text that merely looks alike (another row of the
+    same list) changes whole rows of pixels.
+    """
+    np = ocr_profiler.timed_import("numpy")
+    shared = previous_band.shape[0] - offset
+    if shared <= 0:
+        return False
+    difference = np.abs(previous_band[offset:].astype(np.int16) - current_band[:shared].astype(np.int16))
+    # A row has changed when more than 1% of its pixels did (single pixels are JPEG noise)
+    changed = np.count_nonzero(difference > pixel_threshold, axis=1) > 0.01 * difference.shape[1]
+    return np.count_nonzero(changed) <= max_changed_rows * shared
+
+def find_scroll_offset(previous_gray, current_gray, band=LIST_BAND, probe=0.12, scale=0.25, max_error=0.05,
+                       candidates=8):
+    """
+    How far the list scrolled between two captures of the same size.
+
+    Args:
+        previous_gray, current_gray (np.ndarray): Grayscale captures.
+        probe (float): Height of the matched strip at the top of the current list area,
+            as a fraction of the frame height.
+        scale (float): Downscale factor applied before the coarse match.
+        max_error (float): Largest normalised squared difference for a candidate offset.
+        candidates (int): Best-scoring coarse offsets checked against the full overlap.
+
+    Returns:
+        int or None: Scroll distance in pixels, or None when the captures don't overlap
+        or the overlap is ambiguous.
+    """
+    cv2 = ocr_profiler.timed_import("cv2")
+    np = ocr_profiler.timed_import("numpy")
+    if previous_gray.shape != current_gray.shape:
+        return None
+    top, bottom = band_rows(current_gray.shape[0], band)
+    small = lambda gray: cv2.resize(gray[top:bottom], None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+    previous_small = small(previous_gray)
+    current_small = small(current_gray)
+    probe_rows = max(4, int(probe * current_gray.shape[0] * scale))
+    if probe_rows >= previous_small.shape[0]:
+        return None
+    scores = cv2.matchTemplate(previous_small, current_small[:probe_rows], cv2.TM_SQDIFF_NORMED)[:, 0]
+    coarse = []
+    for y in np.argsort(scores):
+        if scores[y] > max_error or len(coarse) == candidates:
+            break
+        # Neighbouring rows of one minimum are the same candidate
+        if all(abs(int(y) - other) > 2 for other in coarse):
+            coarse.append(int(y))
+
+    # Full resolution (every other column) from here: the scroll is rarely a multiple of
+    # 1 / scale pixels, and text edges only line up at the exact offset
+    previous_band = previous_gray[top:bottom, ::2]
+    current_band = current_gray[top:bottom, ::2]
+    probe_full = current_band[:int(probe_rows / scale)]
+    window = int(2 / scale)
+    agreeing = set()
+    for y in coarse:
+        start = max(0, int(y / scale) - window)
+        stop = min(previous_band.shape[0], int(y / scale) + window + probe_full.shape[0])
+        if stop - start < probe_full.shape[0]:
+            continue
+        fine = cv2.matchTemplate(previous_band[start:stop], probe_full, cv2.TM_SQDIFF_NORMED)[:, 0]
+        offset = start + int(np.argmin(fine))
+        if overlap_agrees(previous_band, current_band, offset):
+            agreeing.add(offset)
+    if len(agreeing) != 1:
+        return None
+    return agreeing.pop()
+
+def new_content_top(previous_gray, current_gray, band=LIST_BAND):
+    """
+    Returns:
+        int: First row of current_gray (full resolution) below the content previous_gray
+        already showed, or 0 when the captures don't overlap.
+    """
+    offset = find_scroll_offset(previous_gray, current_gray, band)
+    if offset is None:
+        return 0
+    return band_rows(current_gray.shape[0], band)[1] - offset